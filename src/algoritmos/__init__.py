@@ -1,6 +1,6 @@
 from .detectores_borda import MarrHildreth, Canny, comparar_detectores
-from .segmentacao import Otsu, Watershed, contar_objetos
-from .descritores import CadeiaFreeman
+from .segmentacao import Otsu, Watershed, contar_objetos, transformada_distancia, maximos_regionais
+from .descritores import CadeiaFreeman, IndiceFormas, serializar_cadeia, desserializar_cadeia
 from .filtros import FiltroBox
 from .transformacoes import SegmentacaoCustomizada
 
@@ -11,7 +11,12 @@ __all__ = [
     'Otsu',
     'Watershed',
     'contar_objetos',
+    'transformada_distancia',
+    'maximos_regionais',
     'CadeiaFreeman',
+    'IndiceFormas',
+    'serializar_cadeia',
+    'desserializar_cadeia',
     'FiltroBox',
     'SegmentacaoCustomizada'
 ]
@@ -1,7 +1,77 @@
 import numpy as np
 import sys
 import os
+import struct
+import bisect
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from .segmentacao import contar_objetos
+from utils.progresso import reportar_progresso
+
+
+# Formato binário da cadeia (little-endian, 16 bytes de cabeçalho):
+#   2s  assinatura b'FC'
+#   B   versão do formato
+#   B   reservado (0)
+#   I   linha do ponto inicial
+#   I   coluna do ponto inicial
+#   I   número de códigos n
+# seguido de ceil(3n/8) bytes com os códigos de 3 bits empacotados
+# (bit 0 do código k na posição 3k, bits menos significativos primeiro)
+ASSINATURA_CADEIA = b'FC'
+VERSAO_CADEIA = 1
+CABECALHO_CADEIA = struct.Struct('<2sBBIII')
+
+
+def serializar_cadeia(ponto_inicial, codigo):
+    """
+    Serializa uma cadeia de Freeman no formato binário compacto
+    
+    Args:
+        ponto_inicial (tuple): (linha, coluna) do primeiro ponto do contorno
+        codigo (list): Códigos de direção (0-7)
+        
+    Returns:
+        bytes: Cabeçalho de 16 bytes + códigos empacotados em 3 bits
+    """
+    codigo_arr = np.asarray(codigo, dtype=np.uint8)
+    
+    if codigo_arr.size and codigo_arr.max() > 7:
+        raise ValueError("Códigos de Freeman devem estar entre 0 e 7")
+    
+    bits = np.unpackbits(codigo_arr[:, None], axis=1, bitorder='little')[:, :3]
+    dados = np.packbits(bits.ravel(), bitorder='little')
+    
+    cabecalho = CABECALHO_CADEIA.pack(ASSINATURA_CADEIA, VERSAO_CADEIA, 0,
+                                      ponto_inicial[0], ponto_inicial[1], codigo_arr.size)
+    
+    return cabecalho + dados.tobytes()
+
+
+def desserializar_cadeia(dados):
+    """
+    Lê uma cadeia de Freeman do formato binário compacto
+    
+    Args:
+        dados (bytes): Dados gerados por serializar_cadeia
+        
+    Returns:
+        tuple: (ponto_inicial, codigo)
+    """
+    if len(dados) < CABECALHO_CADEIA.size:
+        raise ValueError("Dados insuficientes para o cabeçalho da cadeia")
+    
+    assinatura, versao, _, linha, coluna, n = CABECALHO_CADEIA.unpack_from(dados)
+    
+    if assinatura != ASSINATURA_CADEIA or versao != VERSAO_CADEIA:
+        raise ValueError("Formato de cadeia desconhecido")
+    
+    tamanho = (3 * n + 7) // 8
+    corpo = np.frombuffer(dados, dtype=np.uint8, count=tamanho, offset=CABECALHO_CADEIA.size)
+    
+    bits = np.unpackbits(corpo, bitorder='little')[:3 * n].reshape(n, 3)
+    codigo = bits[:, 0] | (bits[:, 1] << 1) | (bits[:, 2] << 2)
+    
+    return (linha, coluna), codigo.tolist()
 
 
 class CadeiaFreeman:
@@ -22,18 +92,29 @@ class CadeiaFreeman:
             7: (1, 1)     # Sudeste
         }
         
+        # Tabelas de consulta (evitam buscar no dicionário a cada passo):
+        # - direcao_deslocamento[(dy+1)*3 + (dx+1)]: direção do deslocamento (-1 se nenhuma)
+        # - proxima_busca[d]: direção, vista do novo ponto, do vizinho examinado
+        #   antes dele (c = b + direção d-1), onde recomeça a busca horária
+        self.direcao_deslocamento = [-1] * 9
+        for direcao, (dy, dx) in self.direcoes_8.items():
+            self.direcao_deslocamento[(dy + 1) * 3 + (dx + 1)] = direcao
+        
+        self.proxima_busca = []
+        for direcao in range(8):
+            dy, dx = self.direcoes_8[direcao]
+            dy_ant, dx_ant = self.direcoes_8[(direcao - 1) % 8]
+            self.proxima_busca.append(self.direcao_deslocamento[(dy_ant - dy + 1) * 3 + (dx_ant - dx + 1)])
+        
     def encontrar_ponto_inicial(self, imagem_binaria):
-        # Normalizar para 0 e 1
-        img_bin = (imagem_binaria > 0).astype(int)
+        # Primeiro pixel de cima para baixo, esquerda para direita
+        img_bin = imagem_binaria > 0
         
-        # Procurar de cima para baixo, esquerda para direita
-        altura, largura = img_bin.shape
-        for i in range(altura):
-            for j in range(largura):
-                if img_bin[i, j] == 1:
-                    return (i, j)
+        if not img_bin.any():
+            return None
         
-        return None
+        i, j = np.unravel_index(np.argmax(img_bin), img_bin.shape)
+        return (int(i), int(j))
     
     def obter_vizinhos_8(self, ponto):
         i, j = ponto
@@ -45,125 +126,114 @@ class CadeiaFreeman:
         
         return vizinhos
     
-    def seguir_contorno(self, imagem_binaria, ponto_inicial):
-        # Normalizar para 0 e 1
-        img_bin = (imagem_binaria > 0).astype(int)
-        altura, largura = img_bin.shape
-        
-        contorno = [ponto_inicial]
-        
-        # b0 = ponto inicial
-        b_atual = ponto_inicial
-        
-        # c0 = vizinho a oeste (direção 4)
-        dy, dx = self.direcoes_8[4]
-        c_atual = (b_atual[0] + dy, b_atual[1] + dx)
+    def _seguir_plano(self, plano, largura_p, inicio, max_iteracoes):
+        # Seguidor de fronteira (Moore) sobre uma imagem binária com margem
+        # de zeros, achatada em bytes: dispensa testes de limites.
+        # Retorna os índices planos do contorno e o código de cada passo.
+        deslocamentos = [dy * largura_p + dx for dy, dx in (self.direcoes_8[d] for d in range(8))]
+        proxima_busca = self.proxima_busca
+        
+        contorno = [inicio]
+        codigo = []
         
-        max_iteracoes = altura * largura  # Prevenir loops infinitos
-        iteracao = 0
+        # b0 = ponto inicial; c0 = vizinho a oeste (direção 4)
+        b_atual = inicio
+        direcao_c = 4
         
-        while iteracao < max_iteracoes:
-            iteracao += 1
-            
-            # Encontrar direção de c_atual em relação a b_atual
-            dc_i = c_atual[0] - b_atual[0]
-            dc_j = c_atual[1] - b_atual[1]
-            
-            # Encontrar qual direção isso representa
-            direcao_c = None
-            for d, (dy, dx) in self.direcoes_8.items():
-                if dy == dc_i and dx == dc_j:
-                    direcao_c = d
-                    break
-            
-            if direcao_c is None:
-                direcao_c = 0
-            
-            # Examinar vizinhos em sentido horário a partir de c_atual
-            encontrado = False
+        for _ in range(max_iteracoes):
+            # Examinar vizinhos em sentido horário a partir de c
             for offset in range(8):
                 direcao = (direcao_c + offset) % 8
-                dy, dx = self.direcoes_8[direcao]
-                vizinho = (b_atual[0] + dy, b_atual[1] + dx)
+                vizinho = b_atual + deslocamentos[direcao]
                 
-                # Verificar limites
-                if 0 <= vizinho[0] < altura and 0 <= vizinho[1] < largura:
-                    if img_bin[vizinho[0], vizinho[1]] == 1:
-                        # Encontrou próximo ponto do contorno
-                        b_proximo = vizinho
-                        
-                        # c_proximo é o vizinho anterior ao b_proximo
-                        direcao_anterior = (direcao - 1) % 8
-                        dy_ant, dx_ant = self.direcoes_8[direcao_anterior]
-                        c_proximo = (b_atual[0] + dy_ant, b_atual[1] + dx_ant)
-                        
-                        # Verificar se voltou ao início
-                        if len(contorno) > 2 and b_proximo == ponto_inicial:
-                            return contorno
-                        
-                        contorno.append(b_proximo)
-                        b_atual = b_proximo
-                        c_atual = c_proximo
-                        encontrado = True
-                        break
-            
-            if not encontrado:
+                if plano[vizinho]:
+                    # Verificar se voltou ao início
+                    if len(contorno) > 2 and vizinho == inicio:
+                        return contorno, codigo
+                    
+                    contorno.append(vizinho)
+                    codigo.append(direcao)
+                    b_atual = vizinho
+                    direcao_c = proxima_busca[direcao]
+                    break
+            else:
                 break
         
-        return contorno
+        return contorno, codigo
+    
+    def seguir_contorno(self, imagem_binaria, ponto_inicial):
+        # Normalizar para 0 e 1, com margem de zeros
+        img_bin = np.pad(imagem_binaria > 0, 1)
+        altura, largura = imagem_binaria.shape
+        largura_p = largura + 2
+        
+        inicio = (ponto_inicial[0] + 1) * largura_p + ponto_inicial[1] + 1
+        
+        # max_iteracoes previne loops infinitos
+        indices, _ = self._seguir_plano(img_bin.tobytes(), largura_p, inicio, altura * largura)
+        
+        return [(k // largura_p - 1, k % largura_p - 1) for k in indices]
     
     def gerar_codigo(self, contorno):
         if len(contorno) < 2:
             return []
         
-        codigo = []
+        # Diferenças entre pontos consecutivos de todo o contorno
+        pontos = np.asarray(contorno, dtype=np.intp)
+        passos = np.diff(pontos, axis=0)
         
-        for k in range(len(contorno) - 1):
-            p_atual = contorno[k]
-            p_proximo = contorno[k + 1]
-            
-            # Calcular diferença
-            di = p_proximo[0] - p_atual[0]
-            dj = p_proximo[1] - p_atual[1]
-            
-            # Encontrar direção correspondente
-            for direcao, (dy, dx) in self.direcoes_8.items():
-                if dy == di and dx == dj:
-                    codigo.append(direcao)
-                    break
+        # Encontrar direção correspondente (tabela de consulta);
+        # passos que não são vizinhos-8 são ignorados
+        vizinhos = np.all(np.abs(passos) <= 1, axis=1)
+        indices = (passos[vizinhos, 0] + 1) * 3 + (passos[vizinhos, 1] + 1)
+        codigo = np.asarray(self.direcao_deslocamento, dtype=np.int8)[indices]
         
-        return codigo
+        return codigo[codigo >= 0].tolist()
+    
+    def _menor_rotacao(self, codigo):
+        # Algoritmo de Booth: início da menor rotação lexicográfica em O(n),
+        # sobre os bytes do código duplicado
+        s = codigo.tobytes() * 2
+        falha = [-1] * len(s)
+        k = 0
+        
+        for j in range(1, len(s)):
+            sj = s[j]
+            i = falha[j - k - 1]
+            while i != -1 and sj != s[k + i + 1]:
+                if sj < s[k + i + 1]:
+                    k = j - i - 1
+                i = falha[i]
+            if sj != s[k + i + 1]:
+                # i == -1
+                if sj < s[k]:
+                    k = j
+                falha[j - k] = -1
+            else:
+                falha[j - k] = i + 1
+        
+        return k
     
     def normalizar_codigo(self, codigo):
-        if not codigo:
+        if len(codigo) == 0:
             return codigo
         
-        # Converter para string para comparação
-        codigo_str = ''.join(map(str, codigo))
+        # Código compacto (1 byte por direção)
+        codigo_arr = np.asarray(codigo, dtype=np.uint8)
+        inicio = self._menor_rotacao(codigo_arr)
         
-        menor = codigo_str
-        for i in range(1, len(codigo)):
-            rotacao = codigo_str[i:] + codigo_str[:i]
-            if rotacao < menor:
-                menor = rotacao
-        
-        return [int(d) for d in menor]
+        return np.concatenate((codigo_arr[inicio:], codigo_arr[:inicio])).tolist()
     
     def primeira_diferenca(self, codigo):
         if len(codigo) < 2:
             return []
         
-        primeira_dif = []
-        
-        for i in range(len(codigo)):
-            # Próximo elemento (circular)
-            proximo = (i + 1) % len(codigo)
-            
-            # Diferença entre direções (módulo 8)
-            dif = (codigo[proximo] - codigo[i]) % 8
-            primeira_dif.append(dif)
+        # Diferença entre cada direção e a próxima (circular), módulo 8.
+        # Em uint8 a subtração é módulo 256, múltiplo de 8.
+        codigo_arr = np.asarray(codigo, dtype=np.uint8)
+        primeira_dif = (np.roll(codigo_arr, -1) - codigo_arr) % 8
         
-        return primeira_dif
+        return primeira_dif.tolist()
     
     def aplicar(self, imagem_binaria):
         print("\n" + "="*60)
@@ -205,6 +275,67 @@ class CadeiaFreeman:
             'primeira_diferenca': primeira_dif
         }
     
+    def aplicar_todos(self, imagem_binaria, area_minima=0):
+        """
+        Extrai a cadeia de Freeman do contorno externo de todos os objetos
+        
+        Os objetos são rotulados em uma única varredura (contar_objetos) e
+        cada contorno é seguido dentro da caixa delimitadora do seu objeto,
+        a partir do seu primeiro pixel em ordem de varredura.
+        
+        Args:
+            imagem_binaria (numpy.ndarray): Imagem binária (0 ou 255)
+            area_minima (int): Objetos menores são ignorados
+            
+        Returns:
+            list: Um dict por objeto com 'rotulo', 'ponto_inicial',
+                  'contorno' e 'codigo'
+        """
+        print("\n" + "="*60)
+        print("CADEIA DE FREEMAN - TODOS OS OBJETOS")
+        print("="*60)
+        
+        num_objetos, rotulos, regioes = contar_objetos(imagem_binaria, estatisticas=True,
+                                                       area_minima=area_minima)
+        
+        resultados = []
+        
+        for k in range(num_objetos):
+            rotulo = k + 1
+            l0, l1 = int(regioes['linha_min'][k]), int(regioes['linha_max'][k]) + 1
+            c0, c1 = int(regioes['coluna_min'][k]), int(regioes['coluna_max'][k]) + 1
+            
+            # Objeto isolado na sua caixa, com margem de zeros
+            objeto = np.pad(rotulos[l0:l1, c0:c1] == rotulo, 1)
+            largura_p = objeto.shape[1]
+            
+            # Ponto inicial: primeiro pixel da linha mais alta do objeto
+            coluna_inicial = int(np.argmax(objeto[1]))
+            inicio = largura_p + coluna_inicial
+            
+            indices, codigo = self._seguir_plano(objeto.tobytes(), largura_p, inicio,
+                                                 rotulos.size)
+            
+            contorno = [(k_ // largura_p - 1 + l0, k_ % largura_p - 1 + c0) for k_ in indices]
+            
+            resultados.append({
+                'rotulo': rotulo,
+                'ponto_inicial': contorno[0],
+                'contorno': contorno,
+                'codigo': codigo
+            })
+            
+            reportar_progresso(rotulo / num_objetos)
+        
+        comprimentos = [len(r['codigo']) for r in resultados]
+        print(f"Objetos: {num_objetos}")
+        if comprimentos:
+            print(f"Comprimento dos códigos: mín={min(comprimentos)}, máx={max(comprimentos)}, "
+                  f"total={sum(comprimentos)}")
+        print("="*60 + "\n")
+        
+        return resultados
+    
     def visualizar_contorno(self, imagem, contorno):
 
         resultado = imagem.copy()
@@ -215,4 +346,103 @@ class CadeiaFreeman:
                 resultado[i, j] = 255
         
         return resultado
+    
+    def reconstruir_contorno(self, ponto_inicial, codigo):
+        """
+        Reconstrói os pontos do contorno a partir do ponto inicial e do código
+        
+        Args:
+            ponto_inicial (tuple): (linha, coluna) do primeiro ponto
+            codigo (list): Códigos de direção (0-7)
+            
+        Returns:
+            list: Pontos (linha, coluna) do contorno
+        """
+        deslocamentos = np.array([self.direcoes_8[d] for d in range(8)])
+        passos = deslocamentos[np.asarray(codigo, dtype=np.intp)].reshape(-1, 2)
+        
+        pontos = np.vstack([np.asarray(ponto_inicial).reshape(1, 2), passos]).cumsum(axis=0)
+        
+        return [tuple(p) for p in pontos.tolist()]
 
+
+class IndiceFormas:
+    """
+    Índice em memória de formas por cadeia de Freeman
+    
+    A chave de cada forma é o seu número de forma: a primeira diferença do
+    código (invariante à rotação) normalizada pela menor rotação
+    (invariante ao ponto inicial), guardada como bytes. A busca exata é
+    uma consulta em dicionário e a busca por prefixo usa as chaves
+    ordenadas, sem percorrer todas as formas.
+    """
+    
+    def __init__(self):
+        self.freeman = CadeiaFreeman()
+        self.formas = {}
+        self.chaves = []
+    
+    def __len__(self):
+        return sum(len(ids) for ids in self.formas.values())
+    
+    def chave(self, codigo):
+        """
+        Calcula a chave (número de forma) de um código
+        
+        Args:
+            codigo (list): Códigos de direção (0-7)
+            
+        Returns:
+            bytes: Primeira diferença normalizada, 1 byte por elemento
+        """
+        primeira_dif = self.freeman.primeira_diferenca(codigo)
+        return bytes(self.freeman.normalizar_codigo(primeira_dif))
+    
+    def adicionar(self, identificador, codigo):
+        """
+        Adiciona uma forma ao índice
+        
+        Args:
+            identificador: Identificação da forma (ex.: nome do arquivo e rótulo)
+            codigo (list): Códigos de direção (0-7)
+        """
+        chave = self.chave(codigo)
+        
+        if chave not in self.formas:
+            self.formas[chave] = []
+            bisect.insort(self.chaves, chave)
+        
+        self.formas[chave].append(identificador)
+    
+    def buscar(self, codigo):
+        """
+        Busca formas com o mesmo número de forma
+        
+        Args:
+            codigo (list): Códigos de direção da forma consultada
+            
+        Returns:
+            list: Identificadores das formas iguais
+        """
+        return list(self.formas.get(self.chave(codigo), []))
+    
+    def buscar_prefixo(self, codigo, tamanho):
+        """
+        Busca formas cujo número de forma começa como o da consulta
+        
+        Args:
+            codigo (list): Códigos de direção da forma consultada
+            tamanho (int): Número de elementos do prefixo comparados
+            
+        Returns:
+            list: Identificadores das formas encontradas
+        """
+        prefixo = self.chave(codigo)[:tamanho]
+        
+        resultado = []
+        posicao = bisect.bisect_left(self.chaves, prefixo)
+        while posicao < len(self.chaves) and self.chaves[posicao].startswith(prefixo):
+            resultado.extend(self.formas[self.chaves[posicao]])
+            posicao += 1
+        
+        return resultado
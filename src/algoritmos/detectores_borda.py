@@ -3,11 +3,14 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from utils.processamento import (
-    criar_mascara_gaussiana, 
+    criar_nucleo,
+    criar_vetor_gaussiano, 
     convolucao, 
+    convolucao_separavel,
     calcular_gradiente,
     normalizar_imagem
 )
+from utils.progresso import reportar_progresso, subetapa
 
 
 class MarrHildreth:
@@ -23,6 +26,9 @@ class MarrHildreth:
         self.sigma = sigma
         self.threshold = threshold
         
+        # Intermediários da última imagem processada (ver calcular_etapas)
+        self.etapas = {}
+        
     def criar_log(self, tamanho, sigma):
         """
         Cria a máscara Laplaciano da Gaussiana (LoG)
@@ -34,28 +40,10 @@ class MarrHildreth:
             sigma (float): Desvio padrão
             
         Returns:
-            numpy.ndarray: Máscara LoG
+            numpy.ndarray: Máscara LoG (somente leitura)
         """
-        # Garantir tamanho ímpar
-        if tamanho % 2 == 0:
-            tamanho += 1
-            
-        centro = tamanho // 2
-        log_mask = np.zeros((tamanho, tamanho))
-        
-        # Calcular valores do LoG
-        for i in range(tamanho):
-            for j in range(tamanho):
-                x = i - centro
-                y = j - centro
-                r2 = x**2 + y**2
-                sigma2 = sigma**2
-                sigma4 = sigma**4
-                
-                # Fórmula do LoG
-                log_mask[i, j] = ((r2 - 2*sigma2) / sigma4) * np.exp(-r2 / (2*sigma2))
-        
-        return log_mask
+        # Núcleo vetorizado e compartilhado (cache LRU, somente leitura)
+        return criar_nucleo('log', tamanho, sigma)
     
     def encontrar_cruzamentos_zero(self, imagem_log, threshold_abs):
         """
@@ -74,68 +62,91 @@ class MarrHildreth:
         altura, largura = imagem_log.shape
         bordas = np.zeros((altura, largura), dtype=np.uint8)
         
-        # Percorrer a imagem (exceto bordas)
-        for i in range(1, altura-1):
-            for j in range(1, largura-1):
-                pixel = imagem_log[i, j]
-                
-                # Verificar os 4 pares de vizinhos opostos
-                # p4-p5 (esquerda-direita)
-                if (pixel * imagem_log[i, j-1] < 0 and 
-                    abs(pixel - imagem_log[i, j-1]) > threshold_abs):
-                    bordas[i, j] = 255
-                    continue
-                
-                # p2-p7 (cima-baixo)
-                if (pixel * imagem_log[i-1, j] < 0 and 
-                    abs(pixel - imagem_log[i-1, j]) > threshold_abs):
-                    bordas[i, j] = 255
-                    continue
-                
-                # p1-p8 (diagonal \)
-                if (pixel * imagem_log[i-1, j-1] < 0 and 
-                    abs(pixel - imagem_log[i-1, j-1]) > threshold_abs):
-                    bordas[i, j] = 255
-                    continue
-                
-                # p3-p6 (diagonal /)
-                if (pixel * imagem_log[i-1, j+1] < 0 and 
-                    abs(pixel - imagem_log[i-1, j+1]) > threshold_abs):
-                    bordas[i, j] = 255
+        if altura < 3 or largura < 3:
+            return bordas
+        
+        # Pixels centrais (exceto bordas) e vizinhos deslocados
+        pixel = imagem_log[1:-1, 1:-1]
+        vizinhos = (
+            imagem_log[1:-1, :-2],   # p4-p5 (esquerda-direita)
+            imagem_log[:-2, 1:-1],   # p2-p7 (cima-baixo)
+            imagem_log[:-2, :-2],    # p1-p8 (diagonal \)
+            imagem_log[:-2, 2:],     # p3-p6 (diagonal /)
+        )
+        
+        # Cruzamento: sinais opostos e diferença acima do threshold
+        # em pelo menos um dos 4 pares
+        cruzamento = np.zeros(pixel.shape, dtype=bool)
+        for vizinho in vizinhos:
+            cruzamento |= (pixel * vizinho < 0) & (np.abs(pixel - vizinho) > threshold_abs)
+        
+        bordas[1:-1, 1:-1][cruzamento] = 255
         
         return bordas
     
-    def aplicar(self, imagem):
+    def calcular_etapas(self, imagem):
         """
-        Aplica o detector de Marr-Hildreth
+        Calcula a resposta LoG, reaproveitando a da última chamada
+        
+        A resposta depende apenas da imagem e de sigma; se nenhum dos dois
+        mudou, a convolução não é refeita (alterar apenas o threshold
+        recalcula só os cruzamentos por zero). A imagem é identificada
+        pelo objeto: após modificá-la no lugar, limpe self.etapas.
         
         Args:
             imagem (numpy.ndarray): Imagem em escala de cinza
             
         Returns:
-            numpy.ndarray: Imagem binária com bordas detectadas
+            dict: Intermediários 'log' (resposta LoG) e 'max_abs'
         """
-        # 1. Calcular tamanho da máscara: n = menor ímpar > 6σ
-        tamanho = int(np.ceil(6 * self.sigma))
-        if tamanho % 2 == 0:
-            tamanho += 1
+        etapas = self.etapas
         
-        print(f"Marr-Hildreth: σ={self.sigma}, tamanho máscara={tamanho}x{tamanho}")
+        if etapas.get('imagem') is not imagem or etapas.get('sigma') != self.sigma:
+            etapas.clear()
+            
+            # 1. Calcular tamanho da máscara: n = menor ímpar > 6σ
+            tamanho = int(np.ceil(6 * self.sigma))
+            if tamanho % 2 == 0:
+                tamanho += 1
+            
+            print(f"Marr-Hildreth: σ={self.sigma}, tamanho máscara={tamanho}x{tamanho}")
+            
+            # 2. Criar máscara LoG
+            log_mask = self.criar_log(tamanho, self.sigma)
+            
+            # 3. Aplicar convolução com LoG
+            with subetapa(0.0, 0.9, "Marr-Hildreth: convolução LoG"):
+                imagem_log = convolucao(imagem, log_mask)
+            
+            # Registrado só ao final: um cancelamento não deixa etapa incompleta
+            etapas.update(imagem=imagem, sigma=self.sigma, log=imagem_log,
+                          max_abs=np.max(np.abs(imagem_log)))
         
-        # 2. Criar máscara LoG
-        log_mask = self.criar_log(tamanho, self.sigma)
+        return etapas
+    
+    def aplicar(self, imagem):
+        """
+        Aplica o detector de Marr-Hildreth
         
-        # 3. Aplicar convolução com LoG
-        imagem_log = convolucao(imagem, log_mask)
+        Args:
+            imagem (numpy.ndarray): Imagem em escala de cinza
+            
+        Returns:
+            numpy.ndarray: Imagem binária com bordas detectadas
+        """
+        # 1-3. Resposta LoG (reaproveitada se imagem e sigma não mudaram)
+        etapas = self.calcular_etapas(imagem)
         
         # 4. Calcular threshold absoluto (% do valor máximo absoluto)
-        max_abs = np.max(np.abs(imagem_log))
+        max_abs = etapas['max_abs']
         threshold_abs = self.threshold * max_abs
         
         print(f"Marr-Hildreth: max(|LoG|)={max_abs:.2f}, threshold={threshold_abs:.2f}")
         
         # 5. Encontrar cruzamentos por zero
-        bordas = self.encontrar_cruzamentos_zero(imagem_log, threshold_abs)
+        reportar_progresso(0.9, "Marr-Hildreth: cruzamentos por zero")
+        bordas = self.encontrar_cruzamentos_zero(etapas['log'], threshold_abs)
+        reportar_progresso(1.0)
         
         return bordas
 
@@ -158,7 +169,7 @@ class Canny:
     4. Dupla limiarização com histerese
     """
     
-    def __init__(self, sigma=1.4, threshold_low=0.04, threshold_high=0.10):
+    def __init__(self, sigma=1.4, threshold_low=0.04, threshold_high=0.10, interpolacao=False):
         """
         Inicializa o detector Canny
         
@@ -166,12 +177,18 @@ class Canny:
             sigma (float): Desvio padrão do filtro Gaussiano
             threshold_low (float): Limiar baixo (% do máximo)
             threshold_high (float): Limiar alto (% do máximo)
+            interpolacao (bool): Supressão não-máxima com interpolação
+                                 sub-pixel da magnitude (em vez de 4 setores)
         """
         self.sigma = sigma
         self.threshold_low = threshold_low
         self.threshold_high = threshold_high
+        self.interpolacao = interpolacao
+        
+        # Intermediários da última imagem processada (ver calcular_etapas)
+        self.etapas = {}
     
-    def supressao_nao_maxima(self, magnitude, direcao):
+    def supressao_nao_maxima(self, magnitude, direcao, interpolacao=None):
         """
         Aplica supressão não-máxima para afinar bordas
         
@@ -180,56 +197,89 @@ class Canny:
         
         Direções:
         - 0° (horizontal): compara com pixels à esquerda e direita
-        - 45°: compara com diagonais NO-SE
+        - 45°: compara com diagonais NE-SO
         - 90° (vertical): compara com pixels acima e abaixo
-        - 135°: compara com diagonais NE-SO
+        - 135°: compara com diagonais NO-SE
+        
+        Com interpolação, os dois vizinhos são amostrados (bilinear) onde a
+        reta do gradiente cruza a borda da vizinhança 3x3. O gradiente é
+        medido com o eixo das linhas para baixo (gy de calcular_gradiente),
+        então 45° aponta para (i+1, j+1): a amostragem é sempre transversal
+        à borda. Os setores do modo discreto mantêm a convenção original
+        (45° compara com (i-1, j+1)) e coincidem com ele só em 0° e 90°.
         
         Args:
             magnitude (numpy.ndarray): Magnitude do gradiente
             direcao (numpy.ndarray): Direção do gradiente (radianos)
+            interpolacao (bool, opcional): Sobrepõe self.interpolacao
             
         Returns:
             numpy.ndarray: Magnitude após supressão não-máxima
             
         """
+        if interpolacao is None:
+            interpolacao = self.interpolacao
+        
         altura, largura = magnitude.shape
-        resultado = np.zeros((altura, largura))
-        
-        # Converter radianos para graus e normalizar para 0-180
-        angulo = np.rad2deg(direcao) % 180
-        
-        for i in range(1, altura-1):
-            for j in range(1, largura-1):
-                mag = magnitude[i, j]
-                ang = angulo[i, j]
-                
-                # Determinar direção e vizinhos a comparar
-                # Direção 0° (horizontal): comparar p4 e p5
-                if (0 <= ang < 22.5) or (157.5 <= ang <= 180):
-                    vizinho1 = magnitude[i, j-1]
-                    vizinho2 = magnitude[i, j+1]
-                
-                # Direção 45°: comparar p3 e p6
-                elif 22.5 <= ang < 67.5:
-                    vizinho1 = magnitude[i-1, j+1]
-                    vizinho2 = magnitude[i+1, j-1]
-                
-                # Direção 90° (vertical): comparar p2 e p7
-                elif 67.5 <= ang < 112.5:
-                    vizinho1 = magnitude[i-1, j]
-                    vizinho2 = magnitude[i+1, j]
-                
-                # Direção 135°: comparar p1 e p8
-                else:  # 112.5 <= ang < 157.5
-                    vizinho1 = magnitude[i-1, j-1]
-                    vizinho2 = magnitude[i+1, j+1]
-                
-                # Manter pixel se for máximo local
-                if mag >= vizinho1 and mag >= vizinho2:
-                    resultado[i, j] = mag
+        resultado = np.zeros((altura, largura), dtype=magnitude.dtype)
+        
+        if altura < 3 or largura < 3:
+            return resultado
+        
+        # Pixels centrais (exceto bordas)
+        mag = magnitude[1:-1, 1:-1]
+        
+        if interpolacao:
+            theta = np.nan_to_num(direcao[1:-1, 1:-1])
+            dy = np.sin(theta)
+            dx = np.cos(theta)
+            
+            # Projetar na borda da vizinhança 3x3 (max(|dy|, |dx|) = 1)
+            escala = np.maximum(np.abs(dy), np.abs(dx))
+            dy /= escala
+            dx /= escala
+            
+            linhas, colunas = np.mgrid[1:altura-1, 1:largura-1]
+            vizinho1 = self._interpolar(magnitude, linhas + dy, colunas + dx)
+            vizinho2 = self._interpolar(magnitude, linhas - dy, colunas - dx)
+        else:
+            # Converter radianos para graus e normalizar para 0-180
+            angulo = np.rad2deg(direcao[1:-1, 1:-1]) % 180
+            
+            # Quantizar em 4 setores (o restante, inclusive NaN, é 135°)
+            setor_0 = ((0 <= angulo) & (angulo < 22.5)) | ((157.5 <= angulo) & (angulo <= 180))
+            setor_45 = (22.5 <= angulo) & (angulo < 67.5)
+            setor_90 = (67.5 <= angulo) & (angulo < 112.5)
+            setores = [setor_0, setor_45, setor_90]
+            
+            # Vizinhos deslocados: p4/p5, p3/p6, p2/p7 e p1/p8
+            vizinho1 = np.select(setores, [magnitude[1:-1, :-2],
+                                           magnitude[:-2, 2:],
+                                           magnitude[:-2, 1:-1]],
+                                 default=magnitude[:-2, :-2])
+            vizinho2 = np.select(setores, [magnitude[1:-1, 2:],
+                                           magnitude[2:, :-2],
+                                           magnitude[2:, 1:-1]],
+                                 default=magnitude[2:, 2:])
+        
+        # Manter pixel se for máximo local
+        maximo = (mag >= vizinho1) & (mag >= vizinho2)
+        resultado[1:-1, 1:-1] = np.where(maximo, mag, 0)
         
         return resultado
     
+    def _interpolar(self, imagem, linhas, colunas):
+        # Interpolação bilinear em coordenadas dentro de [0, altura-1] x [0, largura-1]
+        altura, largura = imagem.shape
+        
+        l0 = np.clip(np.floor(linhas).astype(np.intp), 0, altura - 2)
+        c0 = np.clip(np.floor(colunas).astype(np.intp), 0, largura - 2)
+        fl = linhas - l0
+        fc = colunas - c0
+        
+        return ((1 - fl) * ((1 - fc) * imagem[l0, c0] + fc * imagem[l0, c0 + 1]) +
+                fl * ((1 - fc) * imagem[l0 + 1, c0] + fc * imagem[l0 + 1, c0 + 1]))
+    
     def dupla_limiarizacao_histerese(self, magnitude_suprimida, threshold_low_abs, threshold_high_abs):
         """
         Aplica dupla limiarização com histerese
@@ -240,6 +290,11 @@ class Canny:
         
         Conecta bordas fracas que estão ligadas a bordas fortes
         
+        A conexão é feita em uma única busca em largura (8-conectividade)
+        a partir das bordas fortes: cada pixel entra na fronteira no máximo
+        uma vez, então o custo é linear no número de pixels. Como no laço
+        original, apenas bordas fracas do interior podem ser incorporadas.
+        
         Args:
             magnitude_suprimida (numpy.ndarray): Magnitude após supressão não-máxima
             threshold_low_abs (float): Threshold baixo absoluto
@@ -251,54 +306,113 @@ class Canny:
         altura, largura = magnitude_suprimida.shape
         
         # Criar imagens de bordas fortes e fracas
-        bordas_fortes = (magnitude_suprimida >= threshold_high_abs).astype(np.uint8)
+        bordas_fortes = magnitude_suprimida >= threshold_high_abs
         bordas_fracas = ((magnitude_suprimida >= threshold_low_abs) & 
-                        (magnitude_suprimida < threshold_high_abs)).astype(np.uint8)
+                        (magnitude_suprimida < threshold_high_abs))
+        
+        # Imagens com 1 pixel de margem para dispensar testes de limites
+        largura_p = largura + 2
+        candidatas = np.zeros((altura + 2, largura_p), dtype=bool)
+        candidatas[2:-2, 2:-2] = bordas_fracas[1:-1, 1:-1]
         
         # Resultado final (inicialmente apenas bordas fortes)
-        resultado = bordas_fortes.copy()
-        
-        # Conectar bordas fracas que estão ligadas a bordas fortes (conectividade-8)
-        alterado = True
-        while alterado:
-            alterado = False
-            for i in range(1, altura-1):
-                for j in range(1, largura-1):
-                    # Se é borda fraca e ainda não foi adicionada
-                    if bordas_fracas[i, j] == 1 and resultado[i, j] == 0:
-                        # Verificar se tem vizinho forte (8-conectividade)
-                        vizinhanca = resultado[i-1:i+2, j-1:j+2]
-                        if np.any(vizinhanca == 1):
-                            resultado[i, j] = 1
-                            alterado = True
-        
-        return (resultado * 255).astype(np.uint8)
+        resultado = np.zeros((altura + 2, largura_p), dtype=bool)
+        resultado[1:-1, 1:-1] = bordas_fortes
+        
+        plano_candidatas = candidatas.ravel()
+        plano_resultado = resultado.ravel()
+        deslocamentos = np.array([-largura_p - 1, -largura_p, -largura_p + 1, -1,
+                                  1, largura_p - 1, largura_p, largura_p + 1])
+        
+        # Busca em largura: a fronteira avança sobre bordas fracas ainda não incluídas
+        fronteira = np.flatnonzero(plano_resultado)
+        while fronteira.size:
+            # Número de iterações desconhecido: apenas ponto de cancelamento
+            reportar_progresso()
+            vizinhos = (fronteira[:, None] + deslocamentos).ravel()
+            vizinhos = np.unique(vizinhos[plano_candidatas[vizinhos]])
+            plano_candidatas[vizinhos] = False
+            plano_resultado[vizinhos] = True
+            fronteira = vizinhos
+        
+        return (resultado[1:-1, 1:-1] * 255).astype(np.uint8)
     
-    def aplicar(self, imagem):
+    def suavizar(self, imagem):
         """
-        Aplica o detector de Canny
+        Suaviza a imagem com o filtro Gaussiano de self.sigma
         
         Args:
             imagem (numpy.ndarray): Imagem em escala de cinza
             
         Returns:
-            numpy.ndarray: Imagem binária com bordas detectadas
+            numpy.ndarray: Imagem suavizada
         """
-        print(f"Canny: σ={self.sigma}, TL={self.threshold_low}, TH={self.threshold_high}")
-        
-        # 1. Suavização com filtro Gaussiano
         tamanho_mask = int(np.ceil(6 * self.sigma))
         if tamanho_mask % 2 == 0:
             tamanho_mask += 1
         
-        mascara_gaussiana = criar_mascara_gaussiana(tamanho_mask, self.sigma)
-        imagem_suavizada = convolucao(imagem, mascara_gaussiana)
+        # Gaussiana separável: duas passadas 1D em vez da máscara 2D
+        vetor_gaussiano = criar_vetor_gaussiano(tamanho_mask, self.sigma)
+        return convolucao_separavel(imagem, vetor_gaussiano, vetor_gaussiano)
+    
+    def calcular_etapas(self, imagem):
+        """
+        Calcula as etapas 1-3, reaproveitando as da última chamada
+        
+        Cada intermediário é guardado com os parâmetros de que depende e
+        só é recalculado se um deles mudou: sigma refaz a suavização e o
+        gradiente, interpolacao refaz apenas a supressão não-máxima e os
+        limiares não afetam nenhuma destas etapas (só a histerese). A
+        imagem é identificada pelo objeto: após modificá-la no lugar,
+        limpe self.etapas.
+        
+        Args:
+            imagem (numpy.ndarray): Imagem em escala de cinza
+            
+        Returns:
+            dict: Intermediários 'suavizada', 'magnitude', 'direcao' e 'suprimida'
+        """
+        etapas = self.etapas
+        
+        if etapas.get('imagem') is not imagem or etapas.get('sigma') != self.sigma:
+            etapas.clear()
+            
+            # 1. Suavização com filtro Gaussiano
+            with subetapa(0.0, 0.4, "Canny: suavização"):
+                imagem_suavizada = self.suavizar(imagem)
+            
+            # 2. Calcular gradiente (magnitude e direção)
+            with subetapa(0.4, 0.6, "Canny: gradiente"):
+                magnitude, direcao = calcular_gradiente(imagem_suavizada, metodo='sobel')
+            
+            # Registrado só ao final: um cancelamento não deixa etapa incompleta
+            etapas.update(imagem=imagem, sigma=self.sigma, suavizada=imagem_suavizada,
+                          magnitude=magnitude, direcao=direcao)
         
-        # 2. Calcular gradiente (magnitude e direção)
-        magnitude, direcao = calcular_gradiente(imagem_suavizada, metodo='sobel')
+        if 'suprimida' not in etapas or etapas['interpolacao'] != self.interpolacao:
+            # 3. Supressão não-máxima
+            reportar_progresso(0.6, "Canny: supressão não-máxima")
+            etapas['suprimida'] = self.supressao_nao_maxima(etapas['magnitude'], etapas['direcao'])
+            etapas['interpolacao'] = self.interpolacao
+        
+        return etapas
+    
+    def aplicar(self, imagem):
+        """
+        Aplica o detector de Canny
+        
+        Args:
+            imagem (numpy.ndarray): Imagem em escala de cinza
+            
+        Returns:
+            numpy.ndarray: Imagem binária com bordas detectadas
+        """
+        print(f"Canny: σ={self.sigma}, TL={self.threshold_low}, TH={self.threshold_high}"
+              f"{', interpolação sub-pixel' if self.interpolacao else ''}")
         
-        # 3. Supressão não-máxima
-        magnitude_suprimida = self.supressao_nao_maxima(magnitude, direcao)
+        # 1-3. Suavização, gradiente e supressão (reaproveitadas se possível)
+        magnitude_suprimida = self.calcular_etapas(imagem)['suprimida']
+        reportar_progresso(0.8, "Canny: histerese")
         
         # 4. Calcular thresholds absolutos
         max_mag = np.max(magnitude_suprimida)
@@ -313,6 +427,7 @@ class Canny:
             threshold_low_abs, 
             threshold_high_abs
         )
+        reportar_progresso(1.0)
         
         return bordas
 
@@ -340,12 +455,14 @@ def comparar_detectores(imagem, sigma_marr=1.5, sigma_canny=1.4,
     # Aplicar Marr-Hildreth
     print("\n--- Marr-Hildreth ---")
     marr = MarrHildreth(sigma=sigma_marr, threshold=threshold_marr)
-    bordas_marr = marr.aplicar(imagem)
+    with subetapa(0.0, 0.5):
+        bordas_marr = marr.aplicar(imagem)
     
     # Aplicar Canny
     print("\n--- Canny ---")
     canny = Canny(sigma=sigma_canny, threshold_low=threshold_low, threshold_high=threshold_high)
-    bordas_canny = canny.aplicar(imagem)
+    with subetapa(0.5, 1.0):
+        bordas_canny = canny.aplicar(imagem)
     
     print("\n" + "="*60)
     print("Diferenças principais:")
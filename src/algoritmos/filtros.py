@@ -3,6 +3,7 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from utils.processamento import adicionar_padding
+from utils.progresso import reportar_progresso, subetapa
 
 
 class FiltroBox:
@@ -73,23 +74,101 @@ class FiltroBox:
                 
                 # Calcular média ponderada
                 resultado[i, j] = np.sum(regiao * mascara)
+            
+            reportar_progresso((i + 1) / altura)
+        
+        print(f"Filtro Box {tamanho}x{tamanho} aplicado com sucesso")
+        
+        return resultado.astype(np.uint8)
+    
+    def criar_imagem_integral(self, imagem):
+        """
+        Cria a imagem integral (summed-area table)
+        
+        integral[i, j] = soma de imagem[:i, :j]. A linha e a coluna iniciais
+        de zeros permitem somar qualquer retângulo com quatro acessos.
+        
+        Args:
+            imagem (numpy.ndarray): Imagem em escala de cinza
+            
+        Returns:
+            numpy.ndarray: Imagem integral com forma (altura+1, largura+1)
+        """
+        altura, largura = imagem.shape
+        
+        # Somas inteiras são exatas; imagens em ponto flutuante usam float64
+        if np.issubdtype(imagem.dtype, np.integer) or imagem.dtype == np.bool_:
+            tipo = np.int64
+        else:
+            tipo = np.float64
+        
+        integral = np.zeros((altura + 1, largura + 1), dtype=tipo)
+        np.cumsum(imagem, axis=0, dtype=tipo, out=integral[1:, 1:])
+        np.cumsum(integral[1:, 1:], axis=1, out=integral[1:, 1:])
+        
+        return integral
+    
+    def aplicar_integral(self, imagem, tamanho, integral=None):
+        """
+        Aplica filtro Box pela imagem integral
+        
+        Custo O(1) por pixel independente do tamanho da máscara. A janela e o
+        padding de zeros são os mesmos de aplicar_manual (pad = tamanho // 2
+        em cada lado, inclusive para tamanhos pares): pixels fora da imagem
+        entram na média com valor zero.
+        
+        Args:
+            imagem (numpy.ndarray): Imagem em escala de cinza
+            tamanho (int): Tamanho da máscara
+            integral (numpy.ndarray, opcional): Imagem integral já calculada
+            
+        Returns:
+            numpy.ndarray: Imagem filtrada
+        """
+        print(f"Aplicando Filtro Box {tamanho}x{tamanho} (imagem integral)...")
+        
+        altura, largura = imagem.shape
+        
+        if integral is None:
+            integral = self.criar_imagem_integral(imagem)
+        
+        pad = tamanho // 2
+        
+        # Limites da janela de cada linha/coluna, recortados à imagem
+        # (a parte recortada corresponde ao padding de zeros)
+        linhas = np.arange(altura) - pad
+        colunas = np.arange(largura) - pad
+        l0 = np.clip(linhas, 0, altura)
+        l1 = np.clip(linhas + tamanho, 0, altura)
+        c0 = np.clip(colunas, 0, largura)
+        c1 = np.clip(colunas + tamanho, 0, largura)
+        
+        soma = (integral[np.ix_(l1, c1)] - integral[np.ix_(l0, c1)] -
+                integral[np.ix_(l1, c0)] + integral[np.ix_(l0, c0)])
+        
+        resultado = soma / (tamanho * tamanho)
         
         print(f"Filtro Box {tamanho}x{tamanho} aplicado com sucesso")
         
         return resultado.astype(np.uint8)
     
-    def aplicar(self, imagem, tamanho):
+    def aplicar(self, imagem, tamanho, modo='integral', integral=None):
         """
         Aplica filtro Box (Questão 5)
         
         Args:
             imagem (numpy.ndarray): Imagem em escala de cinza
             tamanho (int): Tamanho da máscara (2, 3, 5, 7, 11, 21, etc.)
+            modo (str): 'integral' (O(1) por pixel) ou 'manual' (convolução pixel a pixel)
+            integral (numpy.ndarray, opcional): Imagem integral já calculada (modo 'integral')
             
         Returns:
             numpy.ndarray: Imagem filtrada
             
        """
+        if modo not in ('integral', 'manual'):
+            raise ValueError(f"Modo desconhecido: {modo}")
+        
         # Verificar tamanho da imagem
         altura, largura = imagem.shape
         tamanho_img = max(altura, largura)
@@ -98,15 +177,22 @@ class FiltroBox:
             print(f"AVISO: Imagem grande ({altura}x{largura})")
             print(f"       Considere usar máscara maior (11x11, 21x21, 31x31)")
         
+        if modo == 'integral':
+            return self.aplicar_integral(imagem, tamanho, integral)
+        
         return self.aplicar_manual(imagem, tamanho)
     
-    def aplicar_multiplos(self, imagem, tamanhos=[2, 3, 5, 7]):
+    def aplicar_multiplos(self, imagem, tamanhos=[2, 3, 5, 7], modo='integral'):
         """
         Aplica múltiplos tamanhos de filtro Box (para comparação)
         
+        No modo 'integral' a imagem integral é calculada uma única vez
+        e reutilizada para todos os tamanhos.
+        
         Args:
             imagem (numpy.ndarray): Imagem em escala de cinza
             tamanhos (list): Lista de tamanhos a aplicar
+            modo (str): 'integral' ou 'manual'
             
         Returns:
             dict: Dicionário {tamanho: imagem_filtrada}
@@ -117,11 +203,14 @@ class FiltroBox:
         print(f"APLICANDO FILTROS BOX: {tamanhos}")
         print("="*60 + "\n")
         
-        for tamanho in tamanhos:
-            resultado = self.aplicar(imagem, tamanho)
+        integral = self.criar_imagem_integral(imagem) if modo == 'integral' else None
+        
+        for indice, tamanho in enumerate(tamanhos):
+            with subetapa(indice / len(tamanhos), (indice + 1) / len(tamanhos),
+                          f"Filtro Box {tamanho}x{tamanho}"):
+                resultado = self.aplicar(imagem, tamanho, modo=modo, integral=integral)
             resultados[tamanho] = resultado
         
         print("="*60 + "\n")
         
         return resultados
-
@@ -1,8 +1,11 @@
 import numpy as np
 import sys
 import os
+import heapq
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from utils.processamento import criar_histograma, calcular_gradiente, convolucao, criar_mascara_gaussiana
+from utils.processamento import criar_histograma, calcular_gradiente, convolucao_separavel, criar_vetor_gaussiano
+from utils.progresso import reportar_progresso, subetapa
+from utils.visualizacao import colorir_rotulos
 
 
 class Otsu:
@@ -32,35 +35,23 @@ class Otsu:
         Returns:
             int: Threshold ótimo (0-255)
         """
-        # 1. Construir histograma
+        # 1. Construir histograma (uma passada sobre a imagem)
         histograma = criar_histograma(imagem)
         total_pixels = imagem.size
         
-        # 2. Inicializar variáveis
-        max_variancia = 0
-        threshold_otimo = 0
-        soma_total = np.sum(np.arange(256) * histograma)
+        # 2. Pesos e somas do background para todos os thresholds (somas acumuladas)
+        niveis = np.arange(256)
+        peso_background = np.cumsum(histograma)
+        soma_background = np.cumsum(niveis * histograma)
+        soma_total = soma_background[-1]
         
-        # 3. Percorrer todos os possíveis thresholds
-        peso_background = 0
-        soma_background = 0
+        # 3. Calcular peso do foreground
+        peso_foreground = total_pixels - peso_background
         
-        for t in range(256):
-            # Atualizar peso e soma do background
-            peso_background += histograma[t]
-            
-            if peso_background == 0:
-                continue
-            
-            # Calcular peso do foreground
-            peso_foreground = total_pixels - peso_background
-            
-            if peso_foreground == 0:
-                break
-            
-            # Atualizar soma do background
-            soma_background += t * histograma[t]
-            
+        # Thresholds com uma das classes vazia são ignorados
+        validos = (peso_background > 0) & (peso_foreground > 0)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
             # Calcular médias
             media_background = soma_background / peso_background
             media_foreground = (soma_total - soma_background) / peso_foreground
@@ -69,11 +60,16 @@ class Otsu:
             variancia_entre = (peso_background / total_pixels) * \
                              (peso_foreground / total_pixels) * \
                              (media_background - media_foreground) ** 2
-            
-            # Atualizar threshold se variância for maior
-            if variancia_entre > max_variancia:
-                max_variancia = variancia_entre
-                threshold_otimo = t
+        
+        variancia_entre = np.where(validos, variancia_entre, 0)
+        
+        # 4. Primeiro threshold com a maior variância (0 se nenhuma for positiva)
+        threshold_otimo = int(np.argmax(variancia_entre))
+        max_variancia = variancia_entre[threshold_otimo]
+        
+        if max_variancia <= 0:
+            threshold_otimo = 0
+            max_variancia = 0
         
         print(f"Otsu: threshold ótimo = {threshold_otimo}, variância = {max_variancia:.6f}")
         
@@ -97,58 +93,350 @@ class Otsu:
         return imagem_binaria, threshold
 
 
-def contar_objetos(imagem_binaria):
+def _extrair_corridas(imagem_bin):
+    # Corridas (sequências horizontais de pixels 1) em ordem de varredura:
+    # linha, coluna inicial e coluna final (exclusiva)
+    altura, largura = imagem_bin.shape
+    
+    bordas = np.zeros((altura, largura + 2), dtype=np.int8)
+    bordas[:, 1:-1] = imagem_bin
+    transicoes = np.diff(bordas, axis=1)
+    
+    linhas, inicios = np.nonzero(transicoes == 1)
+    _, fins = np.nonzero(transicoes == -1)
+    
+    return linhas, inicios, fins
+
+
+def _pares_adjacentes(linhas, inicios, fins, largura, conectividade):
+    # Pares (a, b) de corridas em linhas consecutivas que se tocam.
+    # As chaves linha*passo + coluna são crescentes em ordem de varredura,
+    # então as corridas da linha anterior que tocam b formam um intervalo
+    # encontrado por busca binária.
+    alcance = 1 if conectividade == 8 else 0
+    passo = largura + 4
+    
+    chave_inicio = linhas * passo + inicios + 2
+    chave_fim = linhas * passo + fins + 2
+    base = (linhas - 1) * passo + 2
+    
+    primeira = np.searchsorted(chave_fim, base + inicios - alcance, side='right')
+    ultima = np.searchsorted(chave_inicio, base + fins + alcance, side='left')
+    
+    contagens = np.maximum(ultima - primeira, 0)
+    total = int(contagens.sum())
+    
+    b = np.repeat(np.arange(len(linhas)), contagens)
+    deslocamento = np.arange(total) - np.repeat(np.cumsum(contagens) - contagens, contagens)
+    a = np.repeat(primeira, contagens) + deslocamento
+    
+    return a, b
+
+
+def _comprimir(pais):
+    # Compressão de caminhos: todo nó passa a apontar direto para a raiz
+    while True:
+        avos = pais[pais]
+        if np.array_equal(avos, pais):
+            return pais
+        pais = avos
+
+
+def _unir(pais, a, b):
+    # Union-find vetorizado: a cada rodada, cada raiz ligada a uma raiz
+    # menor é pendurada na menor delas. A raiz final de cada componente é
+    # o menor índice (primeira corrida em ordem de varredura).
+    while a.size:
+        pais = _comprimir(pais)
+        raiz_a = pais[a]
+        raiz_b = pais[b]
+        
+        diferentes = raiz_a != raiz_b
+        a, b = a[diferentes], b[diferentes]
+        raiz_a, raiz_b = raiz_a[diferentes], raiz_b[diferentes]
+        
+        np.minimum.at(pais, np.maximum(raiz_a, raiz_b), np.minimum(raiz_a, raiz_b))
+    
+    return _comprimir(pais)
+
+
+def _rotular_corridas(imagem_bin, conectividade):
+    # Corridas com o rótulo final (1..num_objetos) de cada uma
+    linhas, inicios, fins = _extrair_corridas(imagem_bin)
+    a, b = _pares_adjacentes(linhas, inicios, fins, imagem_bin.shape[1], conectividade)
+    pais = _unir(np.arange(len(linhas)), a, b)
+    
+    # Rótulos consecutivos na ordem das raízes
+    eh_raiz = pais == np.arange(len(linhas))
+    num_objetos = int(eh_raiz.sum())
+    rotulo_corrida = np.cumsum(eh_raiz)[pais]
+    
+    return linhas, inicios, fins, rotulo_corrida, num_objetos
+
+
+def _pintar_corridas(forma, linhas, inicios, fins, rotulo_corrida, num_objetos):
+    # Imagem de rótulos pela soma acumulada de marcas início/fim das corridas
+    altura, largura = forma
+    tipo = np.uint16 if num_objetos <= np.iinfo(np.uint16).max else np.uint32
+    
+    delta = np.zeros(altura * largura + 1, dtype=np.int64)
+    delta[linhas * largura + inicios] = rotulo_corrida
+    delta[linhas * largura + fins] -= rotulo_corrida
+    
+    return np.cumsum(delta[:-1]).astype(tipo).reshape(altura, largura)
+
+
+def _estatisticas_corridas(rotulo_corrida, num_objetos, linhas, inicios, fins, imagem=None):
+    # Tabela de regiões (estrutura de arrays) agregada a partir das corridas:
+    # o índice k corresponde ao rótulo k + 1
+    comprimentos = fins - inicios
+    
+    def somar(valores):
+        return np.bincount(rotulo_corrida, weights=valores, minlength=num_objetos + 1)[1:]
+    
+    area = somar(comprimentos).astype(np.int64)
+    
+    # Soma das colunas c de uma corrida [inicio, fim): (inicio + fim - 1) * comprimento / 2
+    soma_colunas = somar((inicios + fins - 1) * comprimentos / 2)
+    soma_linhas = somar(linhas * comprimentos)
+    
+    linha_min = np.full(num_objetos + 1, np.iinfo(np.int32).max, dtype=np.int32)
+    coluna_min = np.full(num_objetos + 1, np.iinfo(np.int32).max, dtype=np.int32)
+    linha_max = np.full(num_objetos + 1, -1, dtype=np.int32)
+    coluna_max = np.full(num_objetos + 1, -1, dtype=np.int32)
+    np.minimum.at(linha_min, rotulo_corrida, linhas)
+    np.minimum.at(coluna_min, rotulo_corrida, inicios)
+    np.maximum.at(linha_max, rotulo_corrida, linhas)
+    np.maximum.at(coluna_max, rotulo_corrida, fins - 1)
+    
+    regioes = {
+        'area': area,
+        'linha_min': linha_min[1:],
+        'coluna_min': coluna_min[1:],
+        'linha_max': linha_max[1:],
+        'coluna_max': coluna_max[1:],
+        'centroide_linha': soma_linhas / area,
+        'centroide_coluna': soma_colunas / area,
+    }
+    
+    if imagem is not None:
+        # Somas acumuladas por linha: soma de uma corrida com dois acessos
+        acumulada = np.zeros((imagem.shape[0], imagem.shape[1] + 1), dtype=np.float64)
+        np.cumsum(imagem, axis=1, out=acumulada[:, 1:])
+        soma_corridas = acumulada[linhas, fins] - acumulada[linhas, inicios]
+        regioes['intensidade_media'] = somar(soma_corridas) / area
+    
+    return regioes
+
+
+def contar_objetos(imagem_binaria, conectividade=8, estatisticas=False, area_minima=0, imagem=None):
     """
     Conta objetos em uma imagem binária (Questão 3)
     
-    Usa rotulação de componentes conectados (8-conectividade)
+    Rotulação de componentes conectados em duas passadas sobre corridas:
+    1. Extrai as corridas horizontais e registra as equivalências entre
+       corridas de linhas vizinhas (union-find)
+    2. Resolve as equivalências e pinta os rótulos finais
+    
+    Os rótulos seguem a ordem de varredura do primeiro pixel de cada objeto.
+    As estatísticas e o filtro de área são calculados sobre as corridas,
+    sem novas passadas pela imagem rotulada.
     
     Args:
         imagem_binaria (numpy.ndarray): Imagem binária (0 ou 255)
+        conectividade (int): 4 ou 8
+        estatisticas (bool): Se deve retornar a tabela de regiões
+        area_minima (int): Objetos com área menor são descartados
+        imagem (numpy.ndarray, opcional): Imagem original para a
+                                          intensidade média de cada objeto
         
     Returns:
-        tuple: (num_objetos, imagem_rotulada)
+        tuple: (num_objetos, imagem_rotulada) - rótulos em uint16 ou uint32;
+               com estatisticas=True, (num_objetos, imagem_rotulada, regioes),
+               onde regioes é um dict de arrays (area, linha_min, coluna_min,
+               linha_max, coluna_max, centroide_linha, centroide_coluna e,
+               se imagem for informada, intensidade_media)
     """
+    if conectividade not in (4, 8):
+        raise ValueError("Conectividade deve ser 4 ou 8")
+    
     # Normalizar para 0 e 1
-    imagem_bin = (imagem_binaria > 0).astype(int)
+    imagem_bin = imagem_binaria > 0
     
-    altura, largura = imagem_bin.shape
-    rotulos = np.zeros((altura, largura), dtype=int)
-    rotulo_atual = 1
-    
-    # Percorrer a imagem
-    for i in range(altura):
-        for j in range(largura):
-            if imagem_bin[i, j] == 1 and rotulos[i, j] == 0:
-                # Novo objeto encontrado - usar flood fill
-                pilha = [(i, j)]
-                rotulos[i, j] = rotulo_atual
-                
-                while pilha:
-                    y, x = pilha.pop()
-                    
-                    # Verificar vizinhos 8-conectados
-                    for dy in [-1, 0, 1]:
-                        for dx in [-1, 0, 1]:
-                            if dy == 0 and dx == 0:
-                                continue
-                            
-                            ny, nx = y + dy, x + dx
-                            
-                            # Verificar limites
-                            if 0 <= ny < altura and 0 <= nx < largura:
-                                if imagem_bin[ny, nx] == 1 and rotulos[ny, nx] == 0:
-                                    rotulos[ny, nx] = rotulo_atual
-                                    pilha.append((ny, nx))
-                
-                rotulo_atual += 1
+    # 1ª passada: corridas e equivalências
+    linhas, inicios, fins, rotulo_corrida, num_objetos = _rotular_corridas(imagem_bin, conectividade)
+    
+    regioes = None
+    if estatisticas or area_minima > 0:
+        regioes = _estatisticas_corridas(rotulo_corrida, num_objetos, linhas, inicios, fins, imagem)
+    
+    if area_minima > 0:
+        # Descartar objetos pequenos renumerando os rótulos (ordem preservada)
+        manter = regioes['area'] >= area_minima
+        novos_rotulos = np.zeros(num_objetos + 1, dtype=np.int64)
+        novos_rotulos[1:][manter] = np.arange(1, int(manter.sum()) + 1)
+        rotulo_corrida = novos_rotulos[rotulo_corrida]
+        regioes = {chave: valores[manter] for chave, valores in regioes.items()}
+        
+        removidos = num_objetos - int(manter.sum())
+        num_objetos -= removidos
+        print(f"Contagem: {removidos} objetos com área < {area_minima} descartados")
+    
+    # 2ª passada: pintar as corridas
+    rotulos = _pintar_corridas(imagem_bin.shape, linhas, inicios, fins, rotulo_corrida, num_objetos)
     
-    num_objetos = rotulo_atual - 1
     print(f"Contagem: {num_objetos} objetos encontrados")
     
+    if estatisticas:
+        return num_objetos, rotulos, regioes
+    
     return num_objetos, rotulos
 
 
+def _distancia_colunas(fundo):
+    # Distância 1D de cada pixel ao fundo mais próximo na mesma coluna
+    # (duas varreduras, vetorizadas ao longo das colunas)
+    altura, largura = fundo.shape
+    infinito = altura + largura
+    
+    distancia = np.empty((altura, largura), dtype=np.float64)
+    distancia[0] = np.where(fundo[0], 0, infinito)
+    for i in range(1, altura):
+        distancia[i] = np.where(fundo[i], 0, distancia[i - 1] + 1)
+    for i in range(altura - 2, -1, -1):
+        np.minimum(distancia[i], distancia[i + 1] + 1, out=distancia[i])
+    
+    return distancia
+
+
+def _envelope_parabolas(f):
+    # Para cada coluna r de f: d[q, r] = min_p (q - p)² + f[p, r]
+    # Envelope inferior de parábolas (Felzenszwalb & Huttenlocher), O(n)
+    # por coluna e vetorizado ao longo das colunas
+    n, num = f.shape
+    colunas = np.arange(num)
+    
+    # Pilha de parábolas por coluna: posição v, altura f[v] + v² e
+    # fronteiras z entre parábolas consecutivas
+    v = np.zeros((n, num), dtype=np.intp)
+    base = np.empty((n, num))
+    base[0] = f[0]
+    z = np.empty((n + 1, num))
+    z[0] = -np.inf
+    z[1] = np.inf
+    k = np.zeros(num, dtype=np.intp)
+    
+    for q in range(1, n):
+        fq = f[q] + q * q
+        s = (fq - base[k, colunas]) / (2 * q - 2 * v[k, colunas])
+        
+        # Remover parábolas do topo enquanto a nova as esconde
+        ativas = colunas[s <= z[k, colunas]]
+        while ativas.size:
+            k[ativas] -= 1
+            ka = k[ativas]
+            s[ativas] = (fq[ativas] - base[ka, ativas]) / (2 * q - 2 * v[ka, ativas])
+            ativas = ativas[s[ativas] <= z[ka, ativas]]
+        
+        k += 1
+        v[k, colunas] = q
+        base[k, colunas] = fq
+        z[k, colunas] = s
+        z[k + 1, colunas] = np.inf
+    
+    d = np.empty((n, num))
+    k[:] = 0
+    for q in range(n):
+        avancar = z[k + 1, colunas] < q
+        while avancar.any():
+            k[avancar] += 1
+            avancar = z[k + 1, colunas] < q
+        vk = v[k, colunas]
+        d[q] = (q - vk) ** 2 + f[vk, colunas]
+    
+    return d
+
+
+def transformada_distancia(imagem_binaria):
+    """
+    Transformada de distância euclidiana exata
+    
+    Distância de cada pixel do objeto (≠ 0) ao pixel de fundo (0) mais
+    próximo. Algoritmo separável em duas passadas, linear no número de
+    pixels: distância 1D nas colunas e envelope inferior de parábolas
+    nas linhas.
+    
+    Args:
+        imagem_binaria (numpy.ndarray): Imagem binária (0 ou 255)
+        
+    Returns:
+        numpy.ndarray: Mapa de distâncias (float64; inf se não houver fundo)
+    """
+    fundo = imagem_binaria == 0
+    
+    if not fundo.any():
+        return np.full(fundo.shape, np.inf)
+    
+    # 1ª passada: colunas
+    distancia = _distancia_colunas(fundo)
+    
+    # 2ª passada: linhas (transposta para acesso contíguo)
+    quadrada = _envelope_parabolas(np.ascontiguousarray(distancia.T) ** 2)
+    
+    return np.sqrt(quadrada.T)
+
+
+def maximos_regionais(imagem, conectividade=8):
+    """
+    Encontra os máximos regionais da imagem
+    
+    Um máximo regional é um platô conexo de mesmo valor cujos vizinhos
+    externos são todos estritamente menores.
+    
+    Args:
+        imagem (numpy.ndarray): Imagem (ex.: mapa de distâncias)
+        conectividade (int): 4 ou 8
+        
+    Returns:
+        numpy.ndarray: Máscara booleana dos máximos regionais
+    """
+    preenchida = np.pad(imagem.astype(np.float64), 1, constant_values=-np.inf)
+    centro = preenchida[1:-1, 1:-1]
+    altura, largura = centro.shape
+    
+    if conectividade == 8:
+        deslocamentos = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+    else:
+        deslocamentos = [(-1, 0), (0, -1), (0, 1), (1, 0)]
+    
+    vizinhos = [preenchida[1+di:1+di+altura, 1+dj:1+dj+largura] for di, dj in deslocamentos]
+    
+    # Candidatos: nenhum vizinho maior (candidatos vizinhos têm o mesmo valor)
+    candidatos = np.ones(centro.shape, dtype=bool)
+    for vizinho in vizinhos:
+        candidatos &= centro >= vizinho
+    
+    # Candidatos ligados a um pixel do mesmo platô que tem vizinho maior
+    # não são máximos: o platô inteiro é descartado
+    candidatos_p = np.pad(candidatos, 1)
+    invalidos = np.zeros(centro.shape, dtype=bool)
+    for (di, dj), vizinho in zip(deslocamentos, vizinhos):
+        vizinho_candidato = candidatos_p[1+di:1+di+altura, 1+dj:1+dj+largura]
+        invalidos |= candidatos & (vizinho == centro) & ~vizinho_candidato
+    
+    linhas, inicios, fins, rotulo_corrida, num = _rotular_corridas(candidatos, conectividade)
+    rotulos = _pintar_corridas(centro.shape, linhas, inicios, fins, rotulo_corrida, num)
+    
+    descartados = np.zeros(num + 1, dtype=bool)
+    descartados[rotulos[invalidos]] = True
+    
+    return candidatos & ~descartados[rotulos]
+
+
+# Rótulos especiais da inundação: fora da imagem/máscara e linha de watershed
+_FORA, _LINHA = -2, -1
+
+
 class Watershed:
     """
     Segmentação por Watershed (Bacias Hidrográficas)
@@ -158,33 +446,222 @@ class Watershed:
     - Mínimos regionais = vales (objetos)
     - Divisores de água = fronteiras entre objetos
     
-    Implementação simplificada usando marcadores
+    Inundação controlada por marcadores (Meyer, 1991): a partir dos
+    marcadores rotulados, os pixels são inundados em ordem crescente de
+    altitude (magnitude do gradiente de Sobel), nível a nível. Pixels
+    alcançados por duas bacias diferentes formam as linhas de watershed.
     
     """
     
-    def __init__(self, suavizacao=True, sigma=1.0):
+    def __init__(self, suavizacao=True, sigma=1.0, niveis=256, marcadores_distancia=False):
         """
         Inicializa Watershed
         
         Args:
             suavizacao (bool): Se deve suavizar antes
             sigma (float): Sigma para suavização
+            niveis (int): Níveis de quantização do relevo, inundados
+                          por frentes de onda vetorizadas; None usa a
+                          fila sequencial (heap) sobre o relevo original,
+                          O(N log N) e bem mais lenta
+            marcadores_distancia (bool): Gerar marcadores pelos máximos
+                          regionais da transformada de distância da máscara
+                          de Otsu (separa objetos que se tocam)
         """
         self.suavizacao = suavizacao
         self.sigma = sigma
+        self.niveis = niveis
+        self.marcadores_distancia = marcadores_distancia
+    
+    def inundar(self, relevo, marcadores, mascara=None):
+        """
+        Inunda o relevo a partir dos marcadores (algoritmo de Meyer)
+        
+        Args:
+            relevo (numpy.ndarray): Altitude de cada pixel (ex.: gradiente)
+            marcadores (numpy.ndarray): Marcadores rotulados (0 = sem marcador)
+            mascara (numpy.ndarray, opcional): Apenas pixels True são inundados
+            
+        Returns:
+            tuple: (rotulos, linhas) - rótulos int32 (0 nas linhas e em
+                   pixels não alcançados) e linhas de watershed (0 ou 255)
+        """
+        altura, largura = relevo.shape
+        largura_p = largura + 2
+        
+        # Rótulos com margem: _FORA, _LINHA ou 0 = não rotulado
+        rotulos = np.full((altura + 2, largura_p), _FORA, dtype=np.int64)
+        interior = rotulos[1:-1, 1:-1]
+        interior[...] = 0
+        if mascara is not None:
+            interior[~mascara] = _FORA
+        interior[marcadores > 0] = marcadores[marcadores > 0]
+        
+        # Prioridades: relevo quantizado (fila de baldes) ou original (heap)
+        prioridade = np.zeros((altura + 2, largura_p))
+        if self.niveis:
+            minimo, maximo = relevo.min(), relevo.max()
+            if maximo > minimo:
+                quantizado = (relevo - minimo) / (maximo - minimo) * (self.niveis - 1)
+                prioridade[1:-1, 1:-1] = np.floor(quantizado)
+            prioridade = prioridade.astype(np.int64)
+        else:
+            prioridade[1:-1, 1:-1] = relevo
+        
+        deslocamentos = (-largura_p - 1, -largura_p, -largura_p + 1, -1,
+                         1, largura_p - 1, largura_p, largura_p + 1)
+        
+        if self.niveis:
+            plano = self._inundar_niveis(rotulos.ravel(), prioridade.ravel(),
+                                         np.array(deslocamentos))
+        else:
+            plano = self._inundar_heap(rotulos, prioridade, deslocamentos)
+        
+        resultado = np.asarray(plano, dtype=np.int64).reshape(altura + 2, largura_p)[1:-1, 1:-1]
+        linhas = (resultado == _LINHA).astype(np.uint8) * 255
+        rotulos_finais = np.where(resultado > 0, resultado, 0).astype(np.int32)
+        
+        return rotulos_finais, linhas
+    
+    def _inundar_niveis(self, plano, prioridades, deslocamentos):
+        """
+        Inundação por níveis com frentes de onda vetorizadas
+        
+        Em cada nível h, as bacias avançam em ondas paralelas sobre os
+        pixels não rotulados com altitude <= h (altitude efetiva
+        max(altitude, h), como na fila hierárquica). Cada pixel da onda
+        recebe o único rótulo entre os vizinhos já rotulados, ou vira
+        linha se houver dois. Dois pixels vizinhos da mesma onda com
+        rótulos diferentes são separados tornando linha o de maior índice.
+        
+        Args:
+            plano (numpy.ndarray): Rótulos com margem, achatados (alterado)
+            prioridades (numpy.ndarray): Nível inteiro de cada pixel
+            deslocamentos (numpy.ndarray): Deslocamentos dos 8 vizinhos
+            
+        Returns:
+            numpy.ndarray: plano com os rótulos finais
+        """
+        anteriores = deslocamentos < 0
+        
+        # Pixels a inundar agrupados por nível (um "balde" por nível)
+        candidatos = np.flatnonzero(plano == 0)
+        candidatos = candidatos[np.argsort(prioridades[candidatos], kind='stable')]
+        limites = np.searchsorted(prioridades[candidatos], np.arange(self.niveis + 1))
+        
+        for nivel in range(self.niveis):
+            reportar_progresso(nivel / self.niveis)
+            
+            # Primeira onda: pixels do nível vizinhos de alguma bacia (os de
+            # níveis menores já alcançáveis foram inundados antes)
+            onda = candidatos[limites[nivel]:limites[nivel + 1]]
+            onda = onda[plano[onda] == 0]
+            onda = onda[(plano[onda[:, None] + deslocamentos] > 0).any(axis=1)]
+            
+            while onda.size:
+                # Rótulo único entre os vizinhos rotulados (ondas anteriores)
+                vizinhos = plano[onda[:, None] + deslocamentos]
+                maior = vizinhos.max(axis=1)
+                menor = np.where(vizinhos > 0, vizinhos, maior[:, None]).min(axis=1)
+                rotulo = np.where(menor == maior, maior, _LINHA)
+                plano[onda] = rotulo
+                
+                # Conflitos dentro da onda: vizinho anterior com outro rótulo
+                vizinhos = plano[onda[:, None] + deslocamentos[anteriores]]
+                conflito = (rotulo > 0) & ((vizinhos > 0) & (vizinhos != rotulo[:, None])).any(axis=1)
+                plano[onda[conflito]] = _LINHA
+                
+                # Próxima onda: vizinhos ainda não rotulados até o nível atual
+                frente = onda[(rotulo > 0) & ~conflito]
+                onda = (frente[:, None] + deslocamentos).ravel()
+                onda = np.unique(onda[(plano[onda] == 0) & (prioridades[onda] <= nivel)])
+        
+        return plano
+    
+    def _inundar_heap(self, rotulos, prioridade, deslocamentos):
+        # Inundação sequencial de Meyer com heap sobre o relevo original
+        
+        # Fila inicial: pixels não rotulados vizinhos de algum marcador
+        rotulado = rotulos > 0
+        vizinho_marcador = np.zeros_like(rotulado)
+        vizinho_marcador[1:-1, 1:-1] = (
+            rotulado[:-2, :-2] | rotulado[:-2, 1:-1] | rotulado[:-2, 2:] |
+            rotulado[1:-1, :-2] | rotulado[1:-1, 2:] |
+            rotulado[2:, :-2] | rotulado[2:, 1:-1] | rotulado[2:, 2:])
+        iniciais = np.flatnonzero(vizinho_marcador & (rotulos == 0))
+        
+        plano = rotulos.ravel().tolist()
+        prioridades = prioridade.ravel().tolist()
+        na_fila = bytearray(len(plano))
+        fila = _FilaHeap()
+        
+        for p in iniciais.tolist():
+            na_fila[p] = 1
+            fila.inserir(prioridades[p], p)
+        
+        # Progresso a cada 4096 pixels retirados da fila
+        pendentes = max(plano.count(0), 1)
+        processados = 0
+        
+        while fila:
+            nivel, p = fila.remover()
+            
+            processados += 1
+            if not processados & 0xFFF:
+                reportar_progresso(processados / pendentes)
+            
+            # Rótulo do pixel: único rótulo entre os vizinhos já rotulados
+            rotulo = 0
+            for d in deslocamentos:
+                r = plano[p + d]
+                if r > 0:
+                    if rotulo == 0:
+                        rotulo = r
+                    elif r != rotulo:
+                        rotulo = _LINHA
+                        break
+            
+            plano[p] = rotulo
+            if rotulo == _LINHA:
+                continue
+            
+            # Propagar: a altitude efetiva nunca fica abaixo do nível atual
+            for d in deslocamentos:
+                q = p + d
+                if plano[q] == 0 and not na_fila[q]:
+                    na_fila[q] = 1
+                    fila.inserir(max(prioridades[q], nivel), q)
+        
+        return plano
+    
+    def visualizar(self, rotulos, linhas):
+        """
+        Gera imagem em tons de cinza da segmentação
+        
+        Args:
+            rotulos (numpy.ndarray): Rótulos das bacias
+            linhas (numpy.ndarray): Linhas de watershed
+            
+        Returns:
+            numpy.ndarray: Bacias em tons de cinza e linhas em branco (255)
+        """
+        return colorir_rotulos(rotulos, linhas)
     
     def aplicar(self, imagem, marcadores=None):
         """
         Aplica segmentação Watershed
         
-        Implementação simplificada baseada no gradiente morfológico
-        
         Args:
             imagem (numpy.ndarray): Imagem em escala de cinza
-            marcadores (numpy.ndarray, opcional): Marcadores dos objetos
+            marcadores (numpy.ndarray, opcional): Marcadores rotulados dos
+                objetos (0 = sem marcador). Se não informados, são os
+                objetos de contar_objetos sobre a máscara de Otsu ou, com
+                marcadores_distancia, os máximos regionais da transformada
+                de distância dessa máscara. Neste caso a inundação ocorre
+                sobre a distância invertida, apenas dentro da máscara.
             
         Returns:
-            numpy.ndarray: Imagem segmentada
+            tuple: (rotulos, linhas) - imagem de rótulos e linhas de watershed
         """
         print("Watershed: aplicando segmentação...")
         
@@ -193,30 +670,57 @@ class Watershed:
             tamanho = int(np.ceil(6 * self.sigma))
             if tamanho % 2 == 0:
                 tamanho += 1
-            mascara = criar_mascara_gaussiana(tamanho, self.sigma)
-            imagem = convolucao(imagem, mascara)
+            vetor = criar_vetor_gaussiano(tamanho, self.sigma)
+            with subetapa(0.0, 0.15, "Watershed: suavização"):
+                imagem = convolucao_separavel(imagem, vetor, vetor)
         
         # 2. Calcular gradiente (magnitude)
-        magnitude, _ = calcular_gradiente(imagem, metodo='sobel')
+        with subetapa(0.15, 0.25, "Watershed: gradiente"):
+            magnitude, _ = calcular_gradiente(imagem, metodo='sobel')
+        reportar_progresso(etapa="Watershed: marcadores")
         
-        # 3. Se não houver marcadores, usar Otsu para criar marcadores básicos
+        relevo, mascara = magnitude, None
+        
+        # 3. Se não houver marcadores, obtê-los da máscara de Otsu
         if marcadores is None:
             otsu = Otsu()
             imagem_bin, _ = otsu.aplicar(imagem)
-            marcadores = imagem_bin
-        
-        # 4. Aplicar threshold no gradiente para obter fronteiras
-        # (implementação simplificada - a versão completa requer algoritmo complexo)
-        threshold_grad = np.percentile(magnitude, 85)
-        fronteiras = (magnitude > threshold_grad).astype(np.uint8) * 255
+            
+            if self.marcadores_distancia and (imagem_bin == 0).any():
+                # Centros dos objetos: máximos regionais da distância ao fundo
+                distancia = transformada_distancia(imagem_bin)
+                mascara = imagem_bin > 0
+                _, marcadores = contar_objetos(maximos_regionais(distancia) & mascara)
+                relevo = distancia.max() - distancia
+            else:
+                _, marcadores = contar_objetos(imagem_bin)
         
-        # 5. Combinar marcadores com fronteiras
-        resultado = marcadores.copy()
-        resultado[fronteiras > 0] = 128  # Cinza para fronteiras
+        # 4. Inundar o relevo a partir dos marcadores
+        with subetapa(0.35, 1.0, "Watershed: inundação"):
+            rotulos, linhas = self.inundar(relevo, marcadores, mascara)
         
-        print("Watershed: segmentação concluída")
-        print("Nota: Esta é uma implementação simplificada")
-        print("Para resultados melhores, usar scipy.ndimage.watershed_ift")
+        num_bacias = len(np.unique(rotulos[rotulos > 0]))
+        print(f"Watershed: {num_bacias} bacias, {int(np.count_nonzero(linhas))} pixels de linha")
         
-        return resultado
+        return rotulos, linhas
 
+
+class _FilaHeap:
+    """
+    Fila de prioridade (heap) com desempate FIFO para prioridades reais
+    """
+    
+    def __init__(self):
+        self.heap = []
+        self.contador = 0
+    
+    def __len__(self):
+        return len(self.heap)
+    
+    def inserir(self, prioridade, item):
+        heapq.heappush(self.heap, (prioridade, self.contador, item))
+        self.contador += 1
+    
+    def remover(self):
+        prioridade, _, item = heapq.heappop(self.heap)
+        return prioridade, item
@@ -1,4 +1,8 @@
 import numpy as np
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.processamento import criar_histograma, estatisticas_imagem
 
 
 class SegmentacaoCustomizada:
@@ -50,20 +54,10 @@ class SegmentacaoCustomizada:
         print("  [201-255]  → 255")
         print("="*60 + "\n")
         
-        # Criar cópia da imagem
-        resultado = imagem.copy()
+        # Uma única transformação (LUT ou searchsorted) para todas as faixas
+        faixas, resultado, contagens = self._transformar(imagem, self.tabela)
         
-        # Aplicar transformação para cada faixa
-        for min_val, max_val, novo_val in self.tabela:
-            # Criar máscara para pixels na faixa
-            mascara = (resultado >= min_val) & (resultado <= max_val)
-            
-            # Contar pixels transformados
-            num_pixels = np.sum(mascara)
-            
-            # Aplicar transformação
-            resultado[mascara] = novo_val
-            
+        for (min_val, max_val, novo_val), num_pixels in zip(faixas, contagens):
             print(f"Faixa [{min_val:3d}-{max_val:3d}] → {novo_val:3d}: {num_pixels:6d} pixels")
         
         print("\nSegmentação concluída\n")
@@ -81,14 +75,127 @@ class SegmentacaoCustomizada:
         Returns:
             numpy.ndarray: Imagem segmentada
         """
-        resultado = imagem.copy()
-        
-        for min_val, max_val, novo_val in tabela_custom:
-            mascara = (resultado >= min_val) & (resultado <= max_val)
-            resultado[mascara] = novo_val
+        _, resultado, _ = self._transformar(imagem, tabela_custom)
         
         return resultado
     
+    def _compilar_tabela(self, tabela):
+        """
+        Decompõe a tabela em faixas disjuntas ordenadas
+        
+        Faixas sobrepostas são resolvidas como no laço sequencial: vale a
+        primeira faixa da tabela que contém o valor. Cada faixa perde os
+        trechos já cobertos pelas anteriores (limites ajustados com
+        nextafter, o que vale tanto para valores inteiros quanto reais).
+        
+        Args:
+            tabela (list): Lista de tuplas (min, max, novo_valor)
+            
+        Returns:
+            list: Trechos (min, max, novo_valor, índice da faixa na tabela)
+                  ordenados pelo limite inferior
+        """
+        # Limites NaN não pertencem a nenhuma ordem (nem a faixa alguma)
+        if any(np.isnan(min_val) or np.isnan(max_val) for min_val, max_val, _ in tabela):
+            raise ValueError("Limites de faixa inválidos (NaN)")
+        
+        trechos = []
+        
+        for indice, (min_val, max_val, novo_val) in enumerate(tabela):
+            restantes = [(min_val, max_val)] if min_val <= max_val else []
+            
+            # Remover o que as faixas anteriores já cobrem
+            for inicio, fim, _, _ in trechos:
+                divididos = []
+                for a, b in restantes:
+                    if b < inicio or a > fim:
+                        divididos.append((a, b))
+                        continue
+                    if a < inicio:
+                        divididos.append((a, np.nextafter(float(inicio), -np.inf)))
+                    if b > fim:
+                        divididos.append((np.nextafter(float(fim), np.inf), b))
+                restantes = divididos
+            
+            trechos.extend((a, b, novo_val, indice) for a, b in restantes)
+        
+        return sorted(trechos, key=lambda trecho: trecho[0])
+    
+    def _transformar(self, imagem, tabela):
+        """
+        Aplica a tabela de faixas de uma só vez
+        
+        Cada pixel é mapeado pelo seu valor original, sem que a saída de
+        uma faixa seja reavaliada pelas seguintes; em faixas sobrepostas
+        vale a primeira da tabela. Pixels fora de todas as faixas
+        permanecem inalterados.
+        
+        Args:
+            imagem (numpy.ndarray): Imagem em escala de cinza
+            tabela (list): Lista de tuplas (min, max, novo_valor)
+            
+        Returns:
+            tuple: (faixas na ordem da tabela, imagem transformada,
+                    pixels por faixa)
+        """
+        faixas = list(tabela)
+        trechos = self._compilar_tabela(faixas)
+        
+        if imagem.dtype == np.uint8:
+            resultado, contagens = self._transformar_lut(imagem, trechos, len(faixas))
+            return faixas, resultado, contagens
+        
+        # Outros tipos com valores inteiros em 0-255 (ex.: uint8 convertido
+        # para float) também podem usar a LUT, se os novos valores couberem nela
+        cabe_na_lut = all(float(novo_val).is_integer() and 0 <= novo_val <= 255
+                          for _, _, novo_val in faixas)
+        if cabe_na_lut and imagem.size and imagem.min() >= 0 and imagem.max() <= 255:
+            niveis = imagem.astype(np.uint8)
+            if np.array_equal(niveis, imagem):
+                resultado, contagens = self._transformar_lut(niveis, trechos, len(faixas))
+                return faixas, resultado.astype(imagem.dtype), contagens
+        
+        # Demais tipos: uma busca binária sobre as bordas intercaladas
+        # [min0, max0+, min1, max1+, ...]; posição ímpar = dentro do trecho
+        bordas = np.array([[min_val, np.nextafter(float(max_val), np.inf)]
+                           for min_val, max_val, _, _ in trechos]).reshape(-1)
+        novos = np.zeros(len(bordas) + 1)
+        novos[1::2] = [novo_val for _, _, novo_val, _ in trechos]
+        
+        posicoes = np.searchsorted(bordas, imagem, side='right')
+        dentro = (posicoes & 1).astype(bool)
+        
+        resultado = np.where(dentro, novos.take(posicoes), imagem).astype(imagem.dtype)
+        por_trecho = np.bincount(posicoes.ravel(), minlength=len(novos))[1::2]
+        
+        return faixas, resultado, self._somar_trechos(trechos, por_trecho, len(faixas))
+    
+    def _transformar_lut(self, imagem, trechos, num_faixas):
+        # 8 bits: tabela de 256 entradas e contagens pelo histograma
+        lut = np.arange(256, dtype=np.uint8)
+        histograma = criar_histograma(imagem)
+        por_trecho = []
+        
+        for min_val, max_val, novo_val, _ in trechos:
+            # Níveis inteiros dentro de [min_val, max_val]; limites podem ser
+            # reais ou infinitos (recortados a 0-255 antes de arredondar)
+            inicio = int(np.ceil(np.clip(min_val, 0, 256)))
+            fim = int(np.floor(np.clip(max_val, -1, 255)))
+            if inicio > fim:
+                por_trecho.append(0)
+                continue
+            lut[inicio:fim + 1] = novo_val
+            por_trecho.append(int(histograma[inicio:fim + 1].sum()))
+        
+        return lut[imagem], self._somar_trechos(trechos, por_trecho, num_faixas)
+    
+    def _somar_trechos(self, trechos, por_trecho, num_faixas):
+        # Pixels por faixa da tabela (uma faixa pode ter vários trechos)
+        contagens = [0] * num_faixas
+        for (_, _, _, indice), num_pixels in zip(trechos, por_trecho):
+            contagens[indice] += int(num_pixels)
+        return contagens
+    
     def analisar_distribuicao(self, imagem_original, imagem_segmentada):
         """
         Analisa a distribuição de intensidades antes e depois
@@ -100,21 +207,10 @@ class SegmentacaoCustomizada:
         Returns:
             dict: Estatísticas
         """
+        # Estatísticas pelo histograma (uma passada, sem np.unique)
         stats = {
-            'original': {
-                'min': imagem_original.min(),
-                'max': imagem_original.max(),
-                'media': imagem_original.mean(),
-                'desvio': imagem_original.std(),
-                'niveis_unicos': len(np.unique(imagem_original))
-            },
-            'segmentada': {
-                'min': imagem_segmentada.min(),
-                'max': imagem_segmentada.max(),
-                'media': imagem_segmentada.mean(),
-                'desvio': imagem_segmentada.std(),
-                'niveis_unicos': len(np.unique(imagem_segmentada))
-            }
+            'original': estatisticas_imagem(imagem_original),
+            'segmentada': estatisticas_imagem(imagem_segmentada)
         }
         
         print("\n" + "="*60)
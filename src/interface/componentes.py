@@ -1,7 +1,10 @@
 import tkinter as tk
 from tkinter import ttk
-from PIL import Image, ImageTk
-import numpy as np
+from PIL import ImageTk
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.visualizacao import obter_piramide
 
 class PainelImagem(tk.Frame):
     def __init__(self, parent, titulo="Imagem", largura=400, altura=400):
@@ -15,36 +18,52 @@ class PainelImagem(tk.Frame):
         self.label_info = tk.Label(self, text="Nenhuma imagem", font=('Arial', 9), fg='gray')
         self.label_info.pack(pady=2)
         self.photo_image = None
+        self.imagem_atual = None
+        self.info_atual = ""
+        self.canvas.bind('<Double-Button-1>', lambda e: self.exibir_alta_qualidade())
 
-    def exibir_imagem(self, imagem_array, info=""):
+    def exibir_imagem(self, imagem_array, info="", alta_qualidade=False):
         if imagem_array is None: return
-        if imagem_array.max() > 255 or imagem_array.min() < 0:
-            imagem_array = np.clip(imagem_array, 0, 255)
-        imagem_array = imagem_array.astype(np.uint8)
-        h, w = imagem_array.shape
+        # Pirâmide em cache por array: reexibir não converte nem reduz de novo
+        piramide = obter_piramide(imagem_array)
+        h, w = piramide.forma
         prop = min(self.largura/w, self.altura/h)
-        img_pil = Image.fromarray(imagem_array)
         if prop < 1:
-            img_pil = img_pil.resize((int(w*prop), int(h*prop)), Image.LANCZOS)
+            img_pil = piramide.miniatura(int(w*prop), int(h*prop), alta_qualidade)
+        else:
+            img_pil = piramide.niveis[0]
+        self.imagem_atual, self.info_atual = imagem_array, info
         self.photo_image = ImageTk.PhotoImage(img_pil)
         self.canvas.delete("all")
         self.canvas.create_image(self.largura//2, self.altura//2, anchor=tk.CENTER, image=self.photo_image)
         self.label_info.config(text=info if info else f"{h}x{w}")
 
+    def exibir_alta_qualidade(self):
+        # Reamostragem LANCZOS da resolução original (duplo clique no canvas)
+        if self.imagem_atual is not None:
+            self.exibir_imagem(self.imagem_atual, self.info_atual, alta_qualidade=True)
+
     def limpar(self):
         self.canvas.delete("all")
         self.photo_image = None
+        self.imagem_atual = None
         self.label_info.config(text="Nenhuma imagem")
 
 class JanelaProgresso(tk.Toplevel):
-    def __init__(self, parent, titulo="Processando..."):
+    # Não modal: a janela principal continua respondendo durante a tarefa
+    def __init__(self, parent, titulo="Processando...", ao_cancelar=None):
         super().__init__(parent)
         self.title(titulo)
-        self.geometry("300x100")
+        self.geometry("320x130")
         self.transient(parent)
-        self.grab_set()
-        tk.Label(self, text="Processando...").pack(pady=10)
-        self.pb = ttk.Progressbar(self, mode='indeterminate', length=250)
-        self.pb.pack(pady=10)
-        self.pb.start()
+        self.label_etapa = tk.Label(self, text="Processando...")
+        self.label_etapa.pack(pady=(10, 2))
+        self.pb = ttk.Progressbar(self, mode='determinate', length=280, maximum=100)
+        self.pb.pack(pady=5)
+        if ao_cancelar is not None:
+            tk.Button(self, text="Cancelar", command=ao_cancelar, width=12).pack(pady=5)
+        self.protocol("WM_DELETE_WINDOW", ao_cancelar or self.fechar)
+    def atualizar(self, fracao, etapa=""):
+        self.pb['value'] = 100 * fracao
+        self.label_etapa.config(text=f"{etapa or 'Processando...'} ({100 * fracao:.0f}%)")
     def fechar(self): self.destroy()
@@ -2,7 +2,9 @@ import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import sys
 import os
-import numpy as np
+import time
+import queue
+from concurrent.futures import ThreadPoolExecutor
 
 # Adicionar path do projeto
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -12,9 +14,70 @@ from algoritmos import (
     Otsu, Watershed, contar_objetos,
     CadeiaFreeman, FiltroBox, SegmentacaoCustomizada
 )
-from utils import carregar_imagem, salvar_imagem, plotar_comparacao
+from utils import carregar_imagem, salvar_imagem, plotar_comparacao, reduzir_imagem
+from utils import MonitorProgresso, monitorar, OperacaoCancelada, subetapa
 from interface.componentes import PainelImagem, JanelaProgresso
 
+# Intervalo de verificação da tarefa em segundo plano e atraso para
+# mostrar a janela de progresso (tarefas rápidas não a exibem)
+INTERVALO_VERIFICACAO_MS = 50
+ATRASO_PROGRESSO_MS = 300
+
+# Console: intervalo mínimo entre atualizações do widget e linhas mantidas
+INTERVALO_CONSOLE_MS = 100
+MAX_LINHAS_CONSOLE = 5000
+
+# Pré-visualização: maior lado (pixels) da cópia reduzida e menor sigma
+# usado nela (abaixo disso a máscara LoG de 3x3 quase não responde)
+LADO_PREVIA = 512
+SIGMA_MINIMO_PREVIA = 0.8
+
+# Controles deslizantes: espera após o último movimento antes de recalcular
+ATRASO_PARAMETROS_MS = 150
+
+# Parâmetros ajustáveis por detector: (atributo, rótulo, mínimo, máximo, passo)
+PARAMETROS_DETECTORES = {
+    'canny': [('sigma', "Canny σ", 0.5, 5.0, 0.1),
+              ('threshold_low', "Canny TL", 0.01, 0.5, 0.01),
+              ('threshold_high', "Canny TH", 0.01, 0.8, 0.01)],
+    'marr': [('sigma', "Marr σ", 0.5, 5.0, 0.1),
+             ('threshold', "Marr limiar", 0.0, 0.3, 0.01)],
+}
+
+
+def fator_previa(forma):
+    # Menor fator inteiro que deixa o maior lado com até LADO_PREVIA pixels
+    return -(-max(forma) // LADO_PREVIA)
+
+
+def sigma_previa(sigma, fator):
+    # Em resolução reduzida por fator, sigma é dividido pelo mesmo fator,
+    # sem ficar abaixo do mínimo útil
+    return max(sigma / fator, SIGMA_MINIMO_PREVIA)
+
+
+def ordenar_limiares(baixo, alto, alterado):
+    """
+    Mantém o limiar baixo menor ou igual ao alto
+    
+    O limiar que não foi alterado acompanha o alterado quando os dois
+    se cruzam, como ao arrastar um controle sobre o outro.
+    
+    Args:
+        baixo (float): Limiar baixo (TL)
+        alto (float): Limiar alto (TH)
+        alterado (str): 'threshold_low' ou 'threshold_high'
+        
+    Returns:
+        tuple: (baixo, alto) com baixo <= alto
+    """
+    if baixo > alto:
+        if alterado == 'threshold_low':
+            alto = baixo
+        else:
+            baixo = alto
+    return baixo, alto
+
 
 class JanelaPrincipal(tk.Tk):
     def __init__(self):
@@ -26,6 +89,14 @@ class JanelaPrincipal(tk.Tk):
         self.imagem_original = None
         self.imagem_processada = None
         
+        # Uma única thread de trabalho: as ações nunca se acumulam
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.tarefa = None
+        self.tarefa_pendente = None
+        self.janela_progresso = None
+        self.recalculo_agendado = None
+        self.protocol("WM_DELETE_WINDOW", self.fechar)
+        
         self.criar_menu()
         self.criar_interface()
         self.centralizar_janela()
@@ -47,7 +118,7 @@ class JanelaPrincipal(tk.Tk):
         menu_arquivo.add_command(label="Abrir Imagem...", command=self.carregar_imagem, accelerator="Ctrl+O")
         menu_arquivo.add_command(label="Salvar Resultado...", command=self.salvar_resultado, accelerator="Ctrl+S")
         menu_arquivo.add_separator()
-        menu_arquivo.add_command(label="Sair", command=self.quit)
+        menu_arquivo.add_command(label="Sair", command=self.fechar)
         
         menu_questoes = tk.Menu(menubar, tearoff=0)
         menubar.add_cascade(label="Questões", menu=menu_questoes)
@@ -62,6 +133,7 @@ class JanelaPrincipal(tk.Tk):
         menu_questoes.add_command(label="Q2: Comparar Marr-Hildreth vs Canny", command=self.comparar_detectores)
         menu_questoes.add_command(label="Q3: Otsu + Contar Objetos", command=self.contar_objetos)
         menu_questoes.add_command(label="Q4: Cadeia de Freeman", command=self.aplicar_freeman)
+        menu_questoes.add_command(label="Q4: Cadeia de Freeman (todos os objetos)", command=self.aplicar_freeman_todos)
         
         menu_q5 = tk.Menu(menu_questoes, tearoff=0)
         menu_questoes.add_cascade(label="Q5: Filtros Box", menu=menu_q5)
@@ -119,20 +191,169 @@ class JanelaPrincipal(tk.Tk):
         tk.Button(frame_controles, text="🔄 Limpar Tudo", command=self.limpar_tudo, 
                   font=('Arial', 10), width=18).pack(side=tk.LEFT, pady=5, padx=10)
         
+        # Canny/Marr-Hildreth: resultado rápido em resolução reduzida antes do final
+        self.var_previa = tk.BooleanVar(value=False)
+        tk.Checkbutton(frame_controles, text="⚡ Pré-visualização (Canny/Marr)", variable=self.var_previa,
+                       font=('Arial', 10)).pack(side=tk.LEFT, pady=5, padx=10)
+        
+        self.criar_painel_parametros(frame_inferior)
+        
         sys.stdout = ConsoleRedirect(self.text_console)
 
+    def criar_painel_parametros(self, parent):
+        # Detectores persistentes: guardam os intermediários entre execuções
+        self.detectores = {'canny': Canny(), 'marr': MarrHildreth()}
+        self.parametros = {}
+        
+        frame_parametros = tk.LabelFrame(parent, text="Parâmetros (Canny / Marr-Hildreth)",
+                                         font=('Arial', 10, 'bold'))
+        frame_parametros.pack(fill=tk.X, padx=5, pady=(5, 0))
+        
+        for tipo, parametros in PARAMETROS_DETECTORES.items():
+            self.parametros[tipo] = {}
+            for atributo, rotulo, minimo, maximo, passo in parametros:
+                var = tk.DoubleVar(value=getattr(self.detectores[tipo], atributo))
+                tk.Scale(frame_parametros, label=rotulo, variable=var, from_=minimo, to=maximo,
+                         resolution=passo, orient=tk.HORIZONTAL, length=160,
+                         command=lambda _, t=tipo, a=atributo: self.alterar_parametro(t, a)
+                         ).pack(side=tk.LEFT, padx=5, pady=2)
+                self.parametros[tipo][atributo] = var
+
+    def alterar_parametro(self, tipo, atributo):
+        # Histerese só faz sentido com TL <= TH: o outro controle acompanha
+        parametros = self.parametros[tipo]
+        if 'threshold_low' in parametros and atributo in ('threshold_low', 'threshold_high'):
+            baixo, alto = ordenar_limiares(parametros['threshold_low'].get(),
+                                           parametros['threshold_high'].get(), atributo)
+            parametros['threshold_low'].set(baixo)
+            parametros['threshold_high'].set(alto)
+        self.agendar_recalculo(tipo)
+
+    def agendar_recalculo(self, tipo):
+        # Reaplica o detector quando o controle para de se mover (debounce)
+        if self.recalculo_agendado is not None:
+            self.after_cancel(self.recalculo_agendado)
+        self.recalculo_agendado = self.after(ATRASO_PARAMETROS_MS, self._recalcular, tipo)
+
+    def _recalcular(self, tipo):
+        self.recalculo_agendado = None
+        self.aplicar_detector(tipo)
+
+    # --- EXECUÇÃO EM SEGUNDO PLANO ---
+
+    def executar_tarefa(self, titulo, funcao, ao_concluir=None, ao_erro=None, ao_parcial=None):
+        """
+        Executa funcao() na thread de trabalho sem bloquear a interface
+        
+        O resultado é entregue a ao_concluir na thread da interface (via
+        after). Se já houver uma tarefa em andamento, ela é cancelada e a
+        nova fica na fila; apenas o pedido mais recente é mantido.
+        
+        Args:
+            titulo (str): Nome da tarefa (janela de progresso e console)
+            funcao (callable): Trabalho a executar (sem acessar widgets)
+            ao_concluir (callable, opcional): Recebe o resultado
+            ao_erro (callable, opcional): Recebe a exceção (padrão: console)
+            ao_parcial (callable, opcional): Recebe resultados parciais; se
+                informado, funcao é chamada com uma função publicar(valor)
+        """
+        if self.tarefa is not None:
+            self.tarefa_pendente = (titulo, funcao, ao_concluir, ao_erro, ao_parcial)
+            self.tarefa['monitor'].cancelar()
+            print(f"… cancelando '{self.tarefa['titulo']}'; '{titulo}' na fila")
+            return
+        
+        monitor = MonitorProgresso()
+        parciais = queue.SimpleQueue()
+        
+        def trabalho():
+            with monitorar(monitor):
+                if ao_parcial is not None:
+                    return funcao(parciais.put)
+                return funcao()
+        
+        self.tarefa = {
+            'titulo': titulo,
+            'monitor': monitor,
+            'futuro': self.executor.submit(trabalho),
+            'inicio': time.perf_counter(),
+            'ao_concluir': ao_concluir,
+            'ao_erro': ao_erro,
+            'ao_parcial': ao_parcial,
+            'parciais': parciais,
+        }
+        self.after(INTERVALO_VERIFICACAO_MS, self._verificar_tarefa)
+
+    def cancelar_tarefa(self):
+        # Cancela a tarefa atual e descarta a da fila
+        self.tarefa_pendente = None
+        if self.tarefa is not None:
+            self.tarefa['monitor'].cancelar()
+
+    def _verificar_tarefa(self):
+        tarefa = self.tarefa
+        if tarefa is None:
+            return
+        
+        monitor = tarefa['monitor']
+        
+        # Resultados parciais publicados pela thread de trabalho
+        while not tarefa['parciais'].empty() and not monitor.cancelado.is_set():
+            tarefa['ao_parcial'](tarefa['parciais'].get())
+        
+        if not tarefa['futuro'].done():
+            # Janela de progresso só para tarefas que não terminam logo
+            decorrido = (time.perf_counter() - tarefa['inicio']) * 1000
+            if self.janela_progresso is None and decorrido >= ATRASO_PROGRESSO_MS:
+                self.janela_progresso = JanelaProgresso(self, tarefa['titulo'],
+                                                        ao_cancelar=self.cancelar_tarefa)
+            if self.janela_progresso is not None:
+                self.janela_progresso.atualizar(monitor.fracao, monitor.etapa)
+            self.after(INTERVALO_VERIFICACAO_MS, self._verificar_tarefa)
+            return
+        
+        if self.janela_progresso is not None:
+            self.janela_progresso.fechar()
+            self.janela_progresso = None
+        self.tarefa = None
+        
+        try:
+            resultado = tarefa['futuro'].result()
+            if monitor.cancelado.is_set():
+                raise OperacaoCancelada()
+            if tarefa['ao_concluir'] is not None:
+                tarefa['ao_concluir'](resultado)
+        except OperacaoCancelada:
+            print(f"✗ {tarefa['titulo']}: cancelado")
+        except Exception as e:
+            if tarefa['ao_erro'] is not None:
+                tarefa['ao_erro'](e)
+            else:
+                print(f"Erro ({tarefa['titulo']}): {e}")
+        
+        if self.tarefa_pendente is not None:
+            pendente, self.tarefa_pendente = self.tarefa_pendente, None
+            self.executar_tarefa(*pendente)
+
+    def fechar(self):
+        self.cancelar_tarefa()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        sys.stdout = sys.__stdout__
+        self.destroy()
+
     # --- MÉTODOS DE AÇÃO ---
 
     def carregar_imagem(self):
         caminho = filedialog.askopenfilename(title="Selecionar Imagem",
             filetypes=[("Imagens", "*.png *.jpg *.jpeg *.bmp *.tif *.tiff"), ("Todos os arquivos", "*.*")])
         if caminho:
-            try:
-                self.imagem_original = carregar_imagem(caminho)
-                self.painel_original.exibir_imagem(self.imagem_original)
+            def exibir(imagem):
+                self.imagem_original = imagem
+                self.painel_original.exibir_imagem(imagem)
                 print(f"✓ Imagem carregada: {os.path.basename(caminho)}")
-            except Exception as e:
-                messagebox.showerror("Erro", str(e))
+            
+            self.executar_tarefa("Carregando imagem", lambda: carregar_imagem(caminho), exibir,
+                                 ao_erro=lambda e: messagebox.showerror("Erro", str(e)))
 
     def salvar_resultado(self):
         if self.imagem_processada is None:
@@ -143,70 +364,145 @@ class JanelaPrincipal(tk.Tk):
             salvar_imagem(self.imagem_processada, caminho)
             print(f"✓ Resultado salvo: {caminho}")
 
+    def exibir_resultado(self, imagem, info=""):
+        self.imagem_processada = imagem
+        self.painel_processada.exibir_imagem(imagem, info)
+
     def aplicar_detector(self, tipo):
         if self.imagem_original is None: return
-        try:
-            if tipo == 'marr':
-                det = MarrHildreth(sigma=1.5, threshold=0.04)
-                self.imagem_processada = det.aplicar(self.imagem_original)
-            elif tipo == 'canny':
-                det = Canny(sigma=1.4)
-                self.imagem_processada = det.aplicar(self.imagem_original)
+        imagem = self.imagem_original
+        
+        if tipo in self.detectores:
+            # Valores lidos aqui: os controles podem mudar durante a tarefa
+            detector = self.detectores[tipo]
+            params = {nome: var.get() for nome, var in self.parametros[tipo].items()}
+        
+        def processar(img, fator=1):
+            if tipo in ('marr', 'canny'):
+                if fator > 1:
+                    sigma = sigma_previa(params['sigma'], fator)
+                    return type(detector)(**dict(params, sigma=sigma)).aplicar(img)
+                # Instância persistente: só as etapas afetadas são recalculadas
+                for nome, valor in params.items():
+                    setattr(detector, nome, valor)
+                return detector.aplicar(img)
             elif tipo == 'otsu':
-                det = Otsu()
-                self.imagem_processada, _ = det.aplicar(self.imagem_original)
+                return Otsu().aplicar(img)[0]
             elif tipo == 'watershed':
                 det = Watershed()
-                self.imagem_processada = det.aplicar(self.imagem_original)
-            self.painel_processada.exibir_imagem(self.imagem_processada, tipo.upper())
-        except Exception as e: print(f"Erro: {e}")
+                rotulos, linhas = det.aplicar(img)
+                return det.visualizar(rotulos, linhas)
+        
+        exibir = lambda resultado: self.exibir_resultado(resultado, tipo.upper())
+        fator = fator_previa(imagem.shape)
+        
+        # Sem prévia se as etapas caras já estão calculadas para esta imagem
+        reaproveita = (tipo in self.detectores and detector.etapas.get('imagem') is imagem
+                       and detector.etapas.get('sigma') == params['sigma'])
+        
+        if tipo in ('marr', 'canny') and self.var_previa.get() and fator > 1 and not reaproveita:
+            # Prévia em resolução reduzida, substituída pelo resultado final
+            def processar_com_previa(publicar):
+                with subetapa(0.0, 0.1, "Pré-visualização"):
+                    publicar(processar(reduzir_imagem(imagem, fator), fator))
+                with subetapa(0.1, 1.0):
+                    return processar(imagem)
+            
+            previa = lambda resultado: self.painel_processada.exibir_imagem(
+                resultado, f"{tipo.upper()} (prévia 1/{fator})")
+            self.executar_tarefa(tipo.upper(), processar_com_previa, exibir, ao_parcial=previa)
+            return
+        
+        self.executar_tarefa(tipo.upper(), lambda: processar(imagem), exibir)
 
     def comparar_detectores(self):
         if self.imagem_original is None: return
-        try:
-            marr, canny = comparar_detectores(self.imagem_original)
-            self.imagem_processada = canny
-            self.painel_processada.exibir_imagem(canny, "Canny (Q2)")
+        imagem = self.imagem_original
+        
+        def exibir(resultado):
+            marr, canny = resultado
+            self.exibir_resultado(canny, "Canny (Q2)")
             plotar_comparacao(marr, canny, "Marr-Hildreth", "Canny")
-        except Exception as e: print(f"Erro na comparação: {e}")
+        
+        self.executar_tarefa("Comparação", lambda: comparar_detectores(imagem), exibir)
 
     def contar_objetos(self):
         if self.imagem_original is None: return
-        otsu = Otsu()
-        bin_img, _ = otsu.aplicar(self.imagem_original)
-        n, _ = contar_objetos(bin_img)
-        self.imagem_processada = bin_img
-        self.painel_processada.exibir_imagem(bin_img, f"{n} objetos detectados")
+        imagem = self.imagem_original
+        
+        def processar():
+            otsu = Otsu()
+            bin_img, _ = otsu.aplicar(imagem)
+            n, _, regioes = contar_objetos(bin_img, estatisticas=True)
+            if n:
+                areas = regioes['area']
+                print(f"Área (pixels): mín={areas.min()}, máx={areas.max()}, média={areas.mean():.1f}")
+                for k in range(min(n, 20)):
+                    print(f"  Objeto {k+1:3d}: área={areas[k]:7d}, "
+                          f"centro=({regioes['centroide_linha'][k]:.1f}, {regioes['centroide_coluna'][k]:.1f})")
+                if n > 20:
+                    print(f"  ... (+{n-20} objetos)")
+            return bin_img, n
+        
+        self.executar_tarefa("Contagem de objetos", processar,
+                             lambda r: self.exibir_resultado(r[0], f"{r[1]} objetos detectados"))
 
     def aplicar_freeman(self):
         if self.imagem_original is None: return
-        otsu = Otsu()
-        bin_img, _ = otsu.aplicar(self.imagem_original)
-        freeman = CadeiaFreeman()
-        res = freeman.aplicar(bin_img)
-        if res:
-            contorno = freeman.visualizar_contorno(self.imagem_original, res['contorno'])
-            self.imagem_processada = contorno
-            self.painel_processada.exibir_imagem(contorno, f"Freeman ({len(res['contorno'])} pontos)")
+        imagem = self.imagem_original
+        
+        def processar():
+            otsu = Otsu()
+            bin_img, _ = otsu.aplicar(imagem)
+            freeman = CadeiaFreeman()
+            res = freeman.aplicar(bin_img)
+            if res:
+                return freeman.visualizar_contorno(imagem, res['contorno']), len(res['contorno'])
+            return None
+        
+        def exibir(resultado):
+            if resultado:
+                self.exibir_resultado(resultado[0], f"Freeman ({resultado[1]} pontos)")
+        
+        self.executar_tarefa("Cadeia de Freeman", processar, exibir)
+
+    def aplicar_freeman_todos(self):
+        if self.imagem_original is None: return
+        imagem = self.imagem_original
+        
+        def processar():
+            otsu = Otsu()
+            bin_img, _ = otsu.aplicar(imagem)
+            freeman = CadeiaFreeman()
+            res = freeman.aplicar_todos(bin_img)
+            pontos = [p for objeto in res for p in objeto['contorno']]
+            return freeman.visualizar_contorno(imagem, pontos), len(res)
+        
+        self.executar_tarefa("Cadeia de Freeman (todos)", processar,
+                             lambda r: self.exibir_resultado(r[0], f"Freeman ({r[1]} objetos)"))
 
     def aplicar_filtro_box(self, tam):
         if self.imagem_original is None: return
-        f = FiltroBox()
-        self.imagem_processada = f.aplicar(self.imagem_original, tam)
-        self.painel_processada.exibir_imagem(self.imagem_processada, f"Box {tam}x{tam}")
+        imagem = self.imagem_original
+        self.executar_tarefa(f"Box {tam}x{tam}", lambda: FiltroBox().aplicar(imagem, tam),
+                             lambda r: self.exibir_resultado(r, f"Box {tam}x{tam}"))
 
     def comparar_filtros_box(self):
         if self.imagem_original is None: return
-        f = FiltroBox()
-        f.aplicar_multiplos(self.imagem_original, [3, 5, 7, 11])
+        imagem = self.imagem_original
+        self.executar_tarefa("Filtros Box", lambda: FiltroBox().aplicar_multiplos(imagem, [3, 5, 7, 11]))
 
     def aplicar_segmentacao_custom(self):
         if self.imagem_original is None: return
-        s = SegmentacaoCustomizada()
-        self.imagem_processada = s.aplicar(self.imagem_original)
-        self.painel_processada.exibir_imagem(self.imagem_processada, "Posterização")
+        imagem = self.imagem_original
+        self.executar_tarefa("Posterização", lambda: SegmentacaoCustomizada().aplicar(imagem),
+                             lambda r: self.exibir_resultado(r, "Posterização"))
 
     def limpar_tudo(self):
+        self.cancelar_tarefa()
+        # Novo dicionário libera os intermediários (a tarefa cancelada segue com o antigo)
+        for detector in self.detectores.values():
+            detector.etapas = {}
         self.imagem_original = None
         self.imagem_processada = None
         self.painel_original.limpar()
@@ -214,8 +510,45 @@ class JanelaPrincipal(tk.Tk):
         self.text_console.delete(1.0, tk.END)
 
 class ConsoleRedirect:
-    def __init__(self, text_widget): self.text_widget = text_widget
+    """
+    Saída padrão redirecionada para o console da janela
+    
+    write() pode ser chamado de qualquer thread: o texto vai para uma fila
+    e a thread da interface o descarrega no widget de uma vez, no máximo a
+    cada intervalo_ms, mantendo apenas as últimas max_linhas linhas.
+    """
+    def __init__(self, text_widget, intervalo_ms=INTERVALO_CONSOLE_MS, max_linhas=MAX_LINHAS_CONSOLE):
+        self.text_widget = text_widget
+        self.intervalo_ms = intervalo_ms
+        self.max_linhas = max_linhas
+        self.fila = queue.SimpleQueue()
+        self.text_widget.after(self.intervalo_ms, self._descarregar)
+
     def write(self, text):
-        self.text_widget.insert(tk.END, text)
-        self.text_widget.see(tk.END)
+        if text:
+            self.fila.put(text)
+
     def flush(self): pass
+
+    def _descarregar(self):
+        partes = []
+        try:
+            while True:
+                partes.append(self.fila.get_nowait())
+        except queue.Empty:
+            pass
+        
+        try:
+            if partes:
+                self.text_widget.insert(tk.END, ''.join(partes))
+                
+                # Limitar o histórico às últimas max_linhas linhas
+                linhas = int(self.text_widget.index('end-1c').split('.')[0])
+                if linhas > self.max_linhas:
+                    self.text_widget.delete('1.0', f'{linhas - self.max_linhas + 1}.0')
+                
+                self.text_widget.see(tk.END)
+            self.text_widget.after(self.intervalo_ms, self._descarregar)
+        except tk.TclError:
+            # Widget destruído (janela fechada)
+            pass
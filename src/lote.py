@@ -0,0 +1,350 @@
+"""
+Processamento em lote (sem interface gráfica)
+
+Aplica uma ou mais operações a todas as imagens de um diretório ou
+padrão glob, distribuindo as imagens entre processos, e grava um
+resultado por imagem e operação mais um resumo em CSV.
+
+Exemplo:
+    python src/main.py lote "images/input/*" -o canny -o box:5 \\
+        -o freeman:area_minima=20 --saida images/output --processos 4
+"""
+
+import sys
+import os
+import io
+import csv
+import ast
+import glob
+import time
+import argparse
+import contextlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+# Adicionar diretório raiz ao path
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from algoritmos import (
+    MarrHildreth, Canny, Otsu, Watershed, contar_objetos,
+    CadeiaFreeman, FiltroBox, SegmentacaoCustomizada, serializar_cadeia
+)
+from utils import carregar_imagem, salvar_imagem, colorir_rotulos
+
+
+EXTENSOES_IMAGEM = ('.png', '.jpg', '.jpeg', '.bmp', '.tif', '.tiff', '.gif')
+
+
+# Cada operação recebe (imagem, parâmetros) e retorna
+# (imagem_resultado, medidas, dados_extras); dados_extras é um dict
+# {extensão: bytes} gravado ao lado da imagem (ex.: cadeias de Freeman)
+
+def _op_canny(imagem, params):
+    bordas = Canny(**params).aplicar(imagem)
+    return bordas, {'pixels_borda': int(np.count_nonzero(bordas))}, {}
+
+
+def _op_marr(imagem, params):
+    bordas = MarrHildreth(**params).aplicar(imagem)
+    return bordas, {'pixels_borda': int(np.count_nonzero(bordas))}, {}
+
+
+def _op_otsu(imagem, params):
+    binaria, threshold = Otsu().aplicar(imagem)
+    return binaria, {'threshold': int(threshold)}, {}
+
+
+def _op_watershed(imagem, params):
+    watershed = Watershed(**params)
+    rotulos, linhas = watershed.aplicar(imagem)
+    return watershed.visualizar(rotulos, linhas), {'regioes': int(rotulos.max())}, {}
+
+
+def _op_count(imagem, params):
+    binaria, _ = Otsu().aplicar(imagem)
+    num, rotulos, regioes = contar_objetos(binaria, estatisticas=True, **params)
+
+    medidas = {'objetos': num}
+    if num:
+        areas = regioes['area']
+        medidas.update(area_min=int(areas.min()), area_max=int(areas.max()),
+                       area_media=round(float(areas.mean()), 2))
+
+    visual = colorir_rotulos(rotulos)
+    return visual, medidas, {}
+
+
+def _op_freeman(imagem, params):
+    binaria, _ = Otsu().aplicar(imagem)
+    freeman = CadeiaFreeman()
+    cadeias = freeman.aplicar_todos(binaria, **params)
+
+    # Contornos desenhados de uma vez sobre a imagem e cadeias no formato
+    # binário (registros serializar_cadeia concatenados)
+    pontos = [ponto for cadeia in cadeias for ponto in cadeia['contorno']]
+    visual = freeman.visualizar_contorno(imagem, pontos)
+    dados = bytearray()
+    for cadeia in cadeias:
+        dados += serializar_cadeia(cadeia['ponto_inicial'], cadeia['codigo'])
+
+    medidas = {'contornos': len(cadeias),
+               'comprimento_total': sum(len(c['codigo']) for c in cadeias)}
+    return visual, medidas, {'.fcc': bytes(dados)}
+
+
+def _op_box(imagem, params):
+    return FiltroBox().aplicar(imagem, **params), {}, {}
+
+
+def _op_posterize(imagem, params):
+    return SegmentacaoCustomizada().aplicar(imagem), {}, {}
+
+
+# nome: (função, parâmetro posicional, parâmetros padrão)
+OPERACOES = {
+    'canny': (_op_canny, 'sigma', {}),
+    'marr': (_op_marr, 'sigma', {}),
+    'otsu': (_op_otsu, None, {}),
+    'watershed': (_op_watershed, 'sigma', {}),
+    'count': (_op_count, 'area_minima', {}),
+    'freeman': (_op_freeman, 'area_minima', {}),
+    'box': (_op_box, 'tamanho', {'tamanho': 3}),
+    'posterize': (_op_posterize, None, {}),
+}
+
+
+def _converter_valor(texto):
+    # Números, booleanos e None pelo literal Python; o resto fica como texto
+    try:
+        return ast.literal_eval(texto)
+    except (ValueError, SyntaxError):
+        return texto
+
+
+def interpretar_operacao(especificacao):
+    """
+    Interpreta uma operação no formato nome[:param=valor,...]
+
+    Um valor sem nome é atribuído ao parâmetro posicional da operação
+    (ex.: 'box:5' equivale a 'box:tamanho=5').
+
+    Args:
+        especificacao (str): Texto da operação (ex.: 'canny:sigma=2')
+
+    Returns:
+        tuple: (nome, parâmetros, rótulo usado nos nomes de arquivo)
+    """
+    nome, _, argumentos = especificacao.partition(':')
+    nome = nome.strip().lower()
+
+    if nome not in OPERACOES:
+        raise ValueError(f"Operação desconhecida: {nome} "
+                         f"(disponíveis: {', '.join(OPERACOES)})")
+
+    _, posicional, padrao = OPERACOES[nome]
+    params = dict(padrao)
+
+    for argumento in filter(None, (a.strip() for a in argumentos.split(','))):
+        chave, sinal, valor = argumento.partition('=')
+        if not sinal:
+            if posicional is None:
+                raise ValueError(f"Operação {nome} não aceita parâmetro posicional")
+            chave, valor = posicional, argumento
+        params[chave.strip()] = _converter_valor(valor.strip())
+
+    rotulo = nome + ''.join(f"_{chave}-{valor}" for chave, valor in sorted(params.items()))
+
+    return nome, params, rotulo
+
+
+def listar_imagens(entradas):
+    """
+    Expande diretórios e padrões glob em uma lista ordenada de imagens
+
+    Args:
+        entradas (list): Diretórios, arquivos ou padrões glob
+
+    Returns:
+        list: Caminhos das imagens (sem repetição)
+    """
+    caminhos = []
+
+    for entrada in entradas:
+        if os.path.isdir(entrada):
+            candidatos = [os.path.join(entrada, nome) for nome in os.listdir(entrada)]
+        else:
+            candidatos = glob.glob(entrada)
+
+        caminhos.extend(c for c in sorted(candidatos)
+                        if os.path.isfile(c) and c.lower().endswith(EXTENSOES_IMAGEM))
+
+    return list(dict.fromkeys(caminhos))
+
+
+def nome_saida(caminho, raiz=None):
+    """
+    Nome base dos resultados de uma imagem
+
+    Inclui a extensão ('0.jpg' → '0_jpg') e os subdiretórios relativos a
+    raiz, para que imagens de mesmo nome não sobrescrevam umas às outras.
+
+    Args:
+        caminho (str): Caminho da imagem
+        raiz (str, opcional): Diretório comum das entradas
+
+    Returns:
+        str: Caminho relativo (sem extensão) dentro da pasta de saída
+    """
+    relativo = os.path.relpath(caminho, raiz) if raiz else os.path.basename(caminho)
+    base, extensao = os.path.splitext(relativo)
+    return f"{base}_{extensao.lstrip('.').lower()}" if extensao else base
+
+
+def processar_imagem(caminho, operacoes, pasta_saida, verboso=False, raiz=None):
+    """
+    Aplica todas as operações a uma imagem (executado nos processos)
+
+    Args:
+        caminho (str): Caminho da imagem
+        operacoes (list): Tuplas (nome, parâmetros, rótulo)
+        pasta_saida (str): Diretório dos resultados
+        verboso (bool): Mantém as mensagens dos algoritmos
+        raiz (str, opcional): Diretório comum das entradas (ver nome_saida)
+
+    Returns:
+        list: Uma linha do resumo (dict) por operação
+    """
+    base = nome_saida(caminho, raiz)
+    linhas = []
+
+    try:
+        imagem = carregar_imagem(caminho)
+    except Exception as e:
+        return [{'arquivo': caminho, 'operacao': rotulo, 'erro': str(e)}
+                for _, _, rotulo in operacoes]
+
+    for nome, params, rotulo in operacoes:
+        linha = {'arquivo': caminho, 'operacao': rotulo,
+                 'altura': imagem.shape[0], 'largura': imagem.shape[1]}
+
+        try:
+            silencio = contextlib.nullcontext() if verboso else contextlib.redirect_stdout(io.StringIO())
+            inicio = time.perf_counter()
+            with silencio:
+                resultado, medidas, extras = OPERACOES[nome][0](imagem, params)
+            linha['tempo_s'] = round(time.perf_counter() - inicio, 4)
+
+            destino = os.path.join(pasta_saida, f"{base}_{rotulo}")
+            os.makedirs(os.path.dirname(destino), exist_ok=True)
+            salvar_imagem(resultado, destino + '.png')
+            for extensao, dados in extras.items():
+                with open(destino + extensao, 'wb') as arquivo:
+                    arquivo.write(dados)
+
+            linha['resultado'] = destino + '.png'
+            linha.update(medidas)
+        except Exception as e:
+            linha['erro'] = f"{type(e).__name__}: {e}"
+
+        linhas.append(linha)
+
+    return linhas
+
+
+def executar_lote(entradas, especificacoes, pasta_saida, processos=None, verboso=False):
+    """
+    Processa todas as imagens e grava o resumo em pasta_saida/resumo.csv
+
+    Args:
+        entradas (list): Diretórios, arquivos ou padrões glob
+        especificacoes (list): Operações no formato nome[:param=valor,...]
+        pasta_saida (str): Diretório dos resultados
+        processos (int, opcional): Número de processos (padrão: núcleos da CPU)
+        verboso (bool): Mantém as mensagens dos algoritmos
+
+    Returns:
+        list: Linhas do resumo, na ordem das imagens
+    """
+    operacoes = [interpretar_operacao(e) for e in especificacoes]
+    caminhos = listar_imagens(entradas)
+
+    if not caminhos:
+        raise ValueError("Nenhuma imagem encontrada nas entradas informadas")
+
+    os.makedirs(pasta_saida, exist_ok=True)
+    raiz = os.path.commonpath([os.path.dirname(os.path.abspath(c)) for c in caminhos])
+    processos = processos or os.cpu_count() or 1
+    processos = min(processos, len(caminhos))
+
+    print(f"Lote: {len(caminhos)} imagens x {len(operacoes)} operações, "
+          f"{processos} processo(s)")
+
+    inicio = time.perf_counter()
+    resultados = {}
+
+    def registrar(caminho, linhas):
+        resultados[caminho] = linhas
+        erros = sum(1 for l in linhas if 'erro' in l)
+        situacao = "ok" if not erros else f"{erros} erro(s)"
+        print(f"[{len(resultados)}/{len(caminhos)}] {os.path.basename(caminho)}: {situacao}")
+
+    if processos == 1:
+        for caminho in caminhos:
+            registrar(caminho, processar_imagem(caminho, operacoes, pasta_saida, verboso, raiz))
+    else:
+        with ProcessPoolExecutor(max_workers=processos) as executor:
+            futuros = {executor.submit(processar_imagem, caminho, operacoes, pasta_saida, verboso, raiz): caminho
+                       for caminho in caminhos}
+            for futuro in as_completed(futuros):
+                registrar(futuros[futuro], futuro.result())
+
+    linhas = [linha for caminho in caminhos for linha in resultados[caminho]]
+
+    # Colunas fixas primeiro, depois as medidas de cada operação
+    fixas = ['arquivo', 'operacao', 'altura', 'largura', 'tempo_s', 'resultado', 'erro']
+    medidas = sorted({chave for linha in linhas for chave in linha} - set(fixas))
+
+    caminho_resumo = os.path.join(pasta_saida, 'resumo.csv')
+    with open(caminho_resumo, 'w', newline='', encoding='utf-8') as arquivo:
+        escritor = csv.DictWriter(arquivo, fieldnames=fixas + medidas)
+        escritor.writeheader()
+        escritor.writerows(linhas)
+
+    print(f"Concluído em {time.perf_counter() - inicio:.2f}s; resumo em {caminho_resumo}")
+
+    return linhas
+
+
+def criar_parser():
+    parser = argparse.ArgumentParser(
+        prog='main.py lote',
+        description="Aplica operações a um conjunto de imagens sem interface gráfica")
+    parser.add_argument('entradas', nargs='+',
+                        help="Diretórios, arquivos ou padrões glob (ex.: 'images/input/*')")
+    parser.add_argument('-o', '--operacao', action='append', required=True, dest='operacoes',
+                        help=f"nome[:param=valor,...]; nomes: {', '.join(OPERACOES)}")
+    parser.add_argument('-s', '--saida', default='images/output',
+                        help="Diretório dos resultados (padrão: images/output)")
+    parser.add_argument('-p', '--processos', type=int, default=None,
+                        help="Número de processos (padrão: núcleos da CPU)")
+    parser.add_argument('-v', '--verboso', action='store_true',
+                        help="Mostra as mensagens dos algoritmos")
+    return parser
+
+
+def main(argv=None):
+    parser = criar_parser()
+    args = parser.parse_args(argv)
+
+    try:
+        linhas = executar_lote(args.entradas, args.operacoes, args.saida,
+                               args.processos, args.verboso)
+    except ValueError as e:
+        parser.error(str(e))
+
+    return 1 if any('erro' in linha for linha in linhas) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,17 +1,31 @@
 import sys
 import os
+import argparse
 
 # Adicionar diretório raiz ao path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from interface import JanelaPrincipal
 
-def main():
-  
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    
+    # Modo lote: sem Tk, argumentos tratados por lote.criar_parser()
+    if argv and argv[0] == 'lote':
+        import lote
+        return lote.main(argv[1:])
+    
+    parser = argparse.ArgumentParser(
+        description="Processamento de Imagens Digitais - Trabalho Final",
+        epilog="Use 'main.py lote --help' para o processamento em lote sem interface")
+    parser.parse_args(argv)
+    
+    # Tk só é importado quando a interface gráfica é usada
+    from interface import JanelaPrincipal
+    
     app = JanelaPrincipal()
     app.mainloop()
+    return 0
 
 
 if __name__ == "__main__":
-    main()
-
+    sys.exit(main())
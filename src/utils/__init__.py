@@ -3,24 +3,47 @@ Módulo de utilitários
 """
 
 from .processamento import (
+    POLITICA_PRECISAO,
+    definir_precisao,
+    tipo_calculo,
     carregar_imagem,
     salvar_imagem,
     normalizar_imagem,
     adicionar_padding,
+    criar_nucleo,
     criar_mascara_gaussiana,
+    criar_vetor_gaussiano,
     calcular_gradiente,
     convolucao,
+    convolucao_separavel,
+    decompor_separavel,
+    escolher_metodo_convolucao,
+    estimar_custos_convolucao,
+    calibrar_custos_convolucao,
     correlacao,
-    criar_histograma
+    reduzir_imagem,
+    criar_histograma,
+    estatisticas_imagem
 )
 
 from .visualizacao import (
+    colorir_rotulos,
+    PiramideExibicao,
+    obter_piramide,
     array_para_photoimage,
     redimensionar_imagem,
     plotar_histograma,
     plotar_comparacao
 )
 
+from .progresso import (
+    OperacaoCancelada,
+    MonitorProgresso,
+    monitorar,
+    reportar_progresso,
+    subetapa
+)
+
 from .validacao import (
     validar_imagem_greyscale,
     validar_imagem_binaria,
@@ -28,19 +51,39 @@ from .validacao import (
 )
 
 __all__ = [
+    'POLITICA_PRECISAO',
+    'definir_precisao',
+    'tipo_calculo',
     'carregar_imagem',
     'salvar_imagem',
     'normalizar_imagem',
     'adicionar_padding',
+    'criar_nucleo',
     'criar_mascara_gaussiana',
+    'criar_vetor_gaussiano',
     'calcular_gradiente',
     'convolucao',
+    'convolucao_separavel',
+    'decompor_separavel',
+    'escolher_metodo_convolucao',
+    'estimar_custos_convolucao',
+    'calibrar_custos_convolucao',
     'correlacao',
+    'reduzir_imagem',
     'criar_histograma',
+    'estatisticas_imagem',
+    'colorir_rotulos',
+    'PiramideExibicao',
+    'obter_piramide',
     'array_para_photoimage',
     'redimensionar_imagem',
     'plotar_histograma',
     'plotar_comparacao',
+    'OperacaoCancelada',
+    'MonitorProgresso',
+    'monitorar',
+    'reportar_progresso',
+    'subetapa',
     'validar_imagem_greyscale',
     'validar_imagem_binaria',
     'validar_parametros_numericos'
@@ -1,15 +1,80 @@
+import time
+from functools import lru_cache
+
 import numpy as np
 from PIL import Image
 
+from .progresso import reportar_progresso, subetapa
+
+
+# Modelo de custo da convolução (segundos por operação elementar)
+# - direta/separavel: por pixel de saída por elemento (tap) da máscara
+# - fft: por ponto da FFT multiplicado por log2(pontos)
+# - fixo_fft: custo fixo de planejar/alocar as três FFTs
+# Valores padrão medidos em uma máquina de referência; podem ser
+# recalibrados para a máquina atual com calibrar_custos_convolucao().
+CUSTOS_CONVOLUCAO = {
+    'direta': 2.0e-9,
+    'separavel': 2.5e-9,
+    'fft': 3.0e-9,
+    'fixo_fft': 1.0e-4,
+}
+
+# Política de precisão
+# - carregamento: tipo das imagens lidas do disco (uint8, 1 byte por pixel);
+#   LUTs, histogramas e limiarizações trabalham diretamente nesse tipo
+# - calculo: tipo das convoluções, gradientes e respostas de filtros
+#   (float32, metade da memória do float64)
+# Tolerância do float32 em imagens 8 bits: erro absoluto da convolução
+# abaixo de 2e-4 níveis de cinza por unidade de soma |máscara| (medido com
+# Gaussianas de 3x3 a 25x25). Mapas binários (Canny, Marr-Hildreth) e as
+# linhas do Watershed só mudam em pixels cuja resposta está a essa
+# distância de um limiar, do zero ou de um empate. Use
+# definir_precisao(calculo=np.float64) para reproduzir o cálculo em float64.
+POLITICA_PRECISAO = {
+    'carregamento': np.uint8,
+    'calculo': np.float32,
+}
+
+
+def definir_precisao(carregamento=None, calculo=None):
+    """
+    Altera a política de precisão usada pelo carregamento e pelos cálculos
+    
+    Args:
+        carregamento (dtype, opcional): Tipo das imagens carregadas
+        calculo (dtype, opcional): Tipo de ponto flutuante dos cálculos
+        
+    Returns:
+        dict: Política em vigor
+    """
+    if carregamento is not None:
+        POLITICA_PRECISAO['carregamento'] = np.dtype(carregamento).type
+    
+    if calculo is not None:
+        if np.dtype(calculo).kind != 'f':
+            raise ValueError("A precisão de cálculo deve ser de ponto flutuante")
+        POLITICA_PRECISAO['calculo'] = np.dtype(calculo).type
+    
+    return dict(POLITICA_PRECISAO)
+
+
+def tipo_calculo():
+    # Tipo de ponto flutuante usado em convoluções e gradientes
+    return POLITICA_PRECISAO['calculo']
 
-def carregar_imagem(caminho):
+
+def carregar_imagem(caminho, dtype=None):
     img = Image.open(caminho)
     
     # Converter para escala de cinza se necessário
     if img.mode != 'L':
         img = img.convert('L')
     
-    return np.array(img, dtype=np.float64)
+    if dtype is None:
+        dtype = POLITICA_PRECISAO['carregamento']
+    
+    return np.array(img, dtype=dtype)
 
 
 def salvar_imagem(imagem, caminho):
@@ -36,54 +101,110 @@ def adicionar_padding(imagem, pad_size, valor=0):
     return np.pad(imagem, pad_size, mode='constant', constant_values=valor)
 
 
-def criar_mascara_gaussiana(tamanho, sigma):
+# Máximo de núcleos (Gaussiana/LoG) mantidos em cache
+TAMANHO_CACHE_NUCLEOS = 64
+
+
+@lru_cache(maxsize=TAMANHO_CACHE_NUCLEOS)
+def _criar_nucleo(tipo, tamanho, sigma, dtype):
     # Garantir que o tamanho seja ímpar
     if tamanho % 2 == 0:
         tamanho += 1
     
-    centro = tamanho // 2
-    mascara = np.zeros((tamanho, tamanho))
+    x = np.arange(tamanho) - tamanho // 2
+    sigma2 = sigma ** 2
+    
+    if tipo == 'gaussiana_1d':
+        nucleo = np.exp(-(x ** 2) / (2 * sigma2))
+        nucleo = nucleo / nucleo.sum()
+    elif tipo == 'gaussiana':
+        # r² = x² + y² em toda a grade de uma vez
+        r2 = x[:, None] ** 2 + x[None, :] ** 2
+        nucleo = np.exp(-r2 / (2 * sigma2))
+        nucleo = nucleo / nucleo.sum()
+    elif tipo == 'log':
+        # ∇²G(x,y) = [(x²+y²-2σ²)/σ⁴] * e^(-(x²+y²)/(2σ²))
+        r2 = x[:, None] ** 2 + x[None, :] ** 2
+        nucleo = ((r2 - 2 * sigma2) / sigma ** 4) * np.exp(-r2 / (2 * sigma2))
+    else:
+        raise ValueError(f"Tipo de núcleo desconhecido: {tipo}")
+    
+    # Somente leitura: a mesma instância é compartilhada entre chamadas
+    nucleo = nucleo.astype(dtype)
+    nucleo.setflags(write=False)
+    
+    return nucleo
+
+
+def criar_nucleo(tipo, tamanho, sigma, dtype=np.float64):
+    """
+    Cria (ou obtém do cache) um núcleo de convolução
     
-    # Calcular valores da gaussiana
-    for i in range(tamanho):
-        for j in range(tamanho):
-            x = i - centro
-            y = j - centro
-            mascara[i, j] = np.exp(-(x**2 + y**2) / (2 * sigma**2))
+    Os núcleos são calculados de forma vetorizada e guardados em um cache
+    LRU limitado a TAMANHO_CACHE_NUCLEOS entradas, com chave
+    (tipo, tamanho, sigma, dtype). O array retornado é somente leitura;
+    use .copy() para modificá-lo.
     
-    # Normalizar para que a soma seja 1
-    return mascara / mascara.sum()
+    Args:
+        tipo (str): 'gaussiana', 'gaussiana_1d' ou 'log'
+        tamanho (int): Tamanho do núcleo (ajustado para ímpar)
+        sigma (float): Desvio padrão
+        dtype: Tipo dos elementos do núcleo
+        
+    Returns:
+        numpy.ndarray: Núcleo somente leitura
+    """
+    return _criar_nucleo(tipo, int(tamanho), float(sigma), np.dtype(dtype))
+
+
+def criar_mascara_gaussiana(tamanho, sigma):
+    # Máscara 2D normalizada (soma 1), do cache de núcleos
+    return criar_nucleo('gaussiana', tamanho, sigma)
+
+
+def criar_vetor_gaussiano(tamanho, sigma):
+    """
+    Cria o vetor 1D da Gaussiana normalizada
+
+    A Gaussiana 2D é separável: criar_mascara_gaussiana(n, σ) é o produto
+    externo deste vetor com ele mesmo.
+
+    Args:
+        tamanho (int): Tamanho do vetor (ajustado para ímpar)
+        sigma (float): Desvio padrão
+
+    Returns:
+        numpy.ndarray: Vetor 1D com soma 1 (somente leitura, do cache)
+    """
+    return criar_nucleo('gaussiana_1d', tamanho, sigma)
 
 
 def calcular_gradiente(imagem, metodo='sobel'):
+    # Gradientes na precisão de cálculo (float32 por padrão)
     if metodo == 'sobel':
-        # Máscaras de Sobel
-        gx_mask = np.array([[-1, 0, 1],
-                           [-2, 0, 2],
-                           [-1, 0, 1]])
-        gy_mask = np.array([[-1, -2, -1],
-                           [0, 0, 0],
-                           [1, 2, 1]])
+        # Máscaras de Sobel (separáveis: suavização [1 2 1] x derivada [-1 0 1])
+        suavizacao = np.array([1, 2, 1])
+        derivada = np.array([-1, 0, 1])
+        gx = convolucao_separavel(imagem, suavizacao, derivada)
+        gy = convolucao_separavel(imagem, derivada, suavizacao)
     
     elif metodo == 'prewitt':
-        # Máscaras de Prewitt
-        gx_mask = np.array([[-1, 0, 1],
-                           [-1, 0, 1],
-                           [-1, 0, 1]])
-        gy_mask = np.array([[-1, -1, -1],
-                           [0, 0, 0],
-                           [1, 1, 1]])
+        # Máscaras de Prewitt (separáveis: média [1 1 1] x derivada [-1 0 1])
+        suavizacao = np.array([1, 1, 1])
+        derivada = np.array([-1, 0, 1])
+        gx = convolucao_separavel(imagem, suavizacao, derivada)
+        gy = convolucao_separavel(imagem, derivada, suavizacao)
     
     elif metodo == 'roberts':
-        # Máscaras de Roberts
+        # Máscaras de Roberts (não separáveis)
         gx_mask = np.array([[1, 0],
                            [0, -1]])
         gy_mask = np.array([[0, 1],
                            [-1, 0]])
-    
-    # Aplicar convolução
-    gx = convolucao(imagem, gx_mask)
-    gy = convolucao(imagem, gy_mask)
+        
+        # Aplicar convolução
+        gx = convolucao(imagem, gx_mask)
+        gy = convolucao(imagem, gy_mask)
     
     # Calcular magnitude e direção
     magnitude = np.sqrt(gx**2 + gy**2)
@@ -92,7 +213,42 @@ def calcular_gradiente(imagem, metodo='sobel'):
     return magnitude, direcao
 
 
-def convolucao(imagem, mascara):
+def _correlacao_deslocamentos(img_padded, mascara, altura, largura):
+    """
+    Correlação vetorizada por deslocamento e acumulação
+
+    Em vez de percorrer cada pixel, percorre cada elemento (tap) da máscara
+    e acumula a imagem com padding deslocada e ponderada por esse peso.
+    O custo continua O(k²) por pixel, mas todo o trabalho é feito em
+    operações de array sobre a imagem inteira.
+
+    Args:
+        img_padded (numpy.ndarray): Imagem já com padding
+        mascara (numpy.ndarray): Máscara (não rotacionada)
+        altura (int): Altura da saída
+        largura (int): Largura da saída
+
+    Returns:
+        numpy.ndarray: Resultado no tipo da imagem (ponto flutuante)
+    """
+    resultado = np.zeros((altura, largura), dtype=img_padded.dtype)
+    altura_mask, largura_mask = mascara.shape
+
+    for a in range(altura_mask):
+        for b in range(largura_mask):
+            peso = mascara[a, b]
+            # Taps nulos (ex.: coluna central de Sobel) não contribuem
+            if peso == 0:
+                continue
+            resultado += peso * img_padded[a:a+altura, b:b+largura]
+        
+        # Progresso por linha da máscara (e ponto de cancelamento)
+        reportar_progresso((a + 1) / altura_mask)
+
+    return resultado
+
+
+def _convolucao_direta(imagem, mascara):
     altura_img, largura_img = imagem.shape
     altura_mask, largura_mask = mascara.shape
     
@@ -103,44 +259,351 @@ def convolucao(imagem, mascara):
     # Adicionar padding
     img_padded = adicionar_padding(imagem, ((pad_h, pad_h), (pad_w, pad_w)))
     
-    # Criar imagem de saída
-    resultado = np.zeros_like(imagem)
-    
-    # Aplicar convolução
-    for i in range(altura_img):
-        for j in range(largura_img):
-            # Extrair região
-            regiao = img_padded[i:i+altura_mask, j:j+largura_mask]
-            # Aplicar máscara (convolução = rotação 180° + correlação)
-            resultado[i, j] = np.sum(regiao * np.flip(mascara))
+    # Convolução = rotação 180° da máscara + correlação (rotação feita uma vez)
+    return _correlacao_deslocamentos(img_padded, np.flip(mascara), altura_img, largura_img)
+
+
+def _convolucao_separavel(imagem, vetor_vertical, vetor_horizontal):
+    # Passada vertical (máscara coluna) seguida da horizontal (máscara linha).
+    # O padding com zeros de cada passada reproduz o padding 2D: as colunas
+    # de padding da passada horizontal valem zero após a passada vertical.
+    with subetapa(0.0, 0.5):
+        intermediaria = _convolucao_direta(imagem, np.reshape(vetor_vertical, (-1, 1)))
+    with subetapa(0.5, 1.0):
+        resultado = _convolucao_direta(intermediaria, np.reshape(vetor_horizontal, (1, -1)))
     
     return resultado
 
 
-def correlacao(imagem, mascara):
+def decompor_separavel(mascara, tolerancia=1e-10):
+    """
+    Verifica se a máscara é separável (posto 1) e a decompõe
+    
+    Uma máscara separável pode ser escrita como produto externo
+    vetor_vertical ⊗ vetor_horizontal (ex.: Gaussiana, Sobel, Prewitt, Box).
+    A decomposição usa a SVD: a máscara é separável quando o segundo
+    valor singular é desprezível em relação ao primeiro.
+    
+    Args:
+        mascara (numpy.ndarray): Máscara 2D
+        tolerancia (float): Limite relativo para o segundo valor singular
+        
+    Returns:
+        tuple: (vetor_vertical, vetor_horizontal) ou None se não for separável
+    """
+    if mascara.ndim != 2 or min(mascara.shape) < 2:
+        return None
+    
+    u, s, vt = np.linalg.svd(mascara.astype(np.float64))
+    
+    if s[0] == 0 or s[1] > tolerancia * s[0]:
+        return None
+    
+    raiz = np.sqrt(s[0])
+    return u[:, 0] * raiz, vt[0, :] * raiz
+
+
+def convolucao_separavel(imagem, vetor_vertical, vetor_horizontal):
+    """
+    Convolução com máscara separável em duas passadas 1D
+    
+    Equivalente a convolucao(imagem, np.outer(vetor_vertical, vetor_horizontal)),
+    com custo O(m + n) por pixel em vez de O(m·n).
+    
+    Args:
+        imagem (numpy.ndarray): Imagem em escala de cinza
+        vetor_vertical (numpy.ndarray): Fator 1D aplicado nas colunas
+        vetor_horizontal (numpy.ndarray): Fator 1D aplicado nas linhas
+        
+    Returns:
+        numpy.ndarray: Imagem convoluída (tipo de cálculo da política de precisão)
+    """
+    tipo = tipo_calculo()
+    return _convolucao_separavel(imagem.astype(tipo, copy=False),
+                                 np.asarray(vetor_vertical, dtype=tipo),
+                                 np.asarray(vetor_horizontal, dtype=tipo))
+
+
+def _tamanho_fft(n):
+    # Menor tamanho >= n cujos fatores primos são 2, 3 e 5 (FFT eficiente)
+    melhor = 2 ** int(np.ceil(np.log2(max(n, 1))))
+    p5 = 1
+    while p5 < melhor:
+        p35 = p5
+        while p35 < melhor:
+            p235 = p35
+            while p235 < n:
+                p235 *= 2
+            melhor = min(melhor, p235)
+            p35 *= 3
+        p5 *= 5
+    return melhor
+
+
+def _convolucao_fft(imagem, mascara):
     altura_img, largura_img = imagem.shape
     altura_mask, largura_mask = mascara.shape
     
-    pad_h = altura_mask // 2
-    pad_w = largura_mask // 2
+    # Tamanho da convolução linear completa: sem sobreposição circular,
+    # o que equivale a padding de zeros ilimitado em volta da imagem
+    forma = (_tamanho_fft(altura_img + altura_mask - 1),
+             _tamanho_fft(largura_img + largura_mask - 1))
     
-    img_padded = adicionar_padding(imagem, ((pad_h, pad_h), (pad_w, pad_w)))
-    resultado = np.zeros_like(imagem)
+    espectro = np.fft.rfft2(imagem, s=forma) * np.fft.rfft2(mascara, s=forma)
+    completa = np.fft.irfft2(espectro, s=forma)
     
-    for i in range(altura_img):
-        for j in range(largura_img):
-            regiao = img_padded[i:i+altura_mask, j:j+largura_mask]
-            resultado[i, j] = np.sum(regiao * mascara)
+    # Recorte alinhado com o padding de k//2 usado pela convolução direta
+    # (também vale para máscaras de tamanho par)
+    inicio_h = altura_mask - 1 - altura_mask // 2
+    inicio_w = largura_mask - 1 - largura_mask // 2
     
-    return resultado
+    return completa[inicio_h:inicio_h+altura_img, inicio_w:inicio_w+largura_img]
+
+
+def estimar_custos_convolucao(forma_imagem, forma_mascara, separavel=False, taps=None):
+    """
+    Estima o custo (em segundos) de cada método de convolução
+    
+    Args:
+        forma_imagem (tuple): (altura, largura) da imagem
+        forma_mascara (tuple): (altura, largura) da máscara
+        separavel (bool): Se a máscara é separável
+        taps (int, opcional): Elementos não nulos da máscara (padrão: todos)
+        
+    Returns:
+        dict: {metodo: custo estimado} apenas para os métodos aplicáveis
+    """
+    altura_img, largura_img = forma_imagem
+    altura_mask, largura_mask = forma_mascara
+    pixels = altura_img * largura_img
+    
+    if taps is None:
+        taps = altura_mask * largura_mask
+    
+    pontos_fft = (_tamanho_fft(altura_img + altura_mask - 1) *
+                  _tamanho_fft(largura_img + largura_mask - 1))
+    
+    custos = {
+        'direta': CUSTOS_CONVOLUCAO['direta'] * pixels * taps,
+        'fft': (CUSTOS_CONVOLUCAO['fft'] * pontos_fft * np.log2(pontos_fft) +
+                CUSTOS_CONVOLUCAO['fixo_fft']),
+    }
+    
+    if separavel:
+        custos['separavel'] = CUSTOS_CONVOLUCAO['separavel'] * pixels * (altura_mask + largura_mask)
+    
+    return custos
+
+
+def escolher_metodo_convolucao(forma_imagem, mascara, separavel=None):
+    """
+    Escolhe o método de convolução mais barato pelo modelo de custo
+    
+    Args:
+        forma_imagem (tuple): (altura, largura) da imagem
+        mascara (numpy.ndarray): Máscara 2D
+        separavel (bool, opcional): Se None, a separabilidade é detectada
+        
+    Returns:
+        str: 'direta', 'separavel' ou 'fft'
+    """
+    if separavel is None:
+        separavel = decompor_separavel(mascara) is not None
+    
+    custos = estimar_custos_convolucao(forma_imagem, mascara.shape, separavel,
+                                       taps=int(np.count_nonzero(mascara)))
+    
+    return min(custos, key=custos.get)
+
+
+def calibrar_custos_convolucao(tamanho=512, tamanho_mascara=15, repeticoes=3):
+    """
+    Calibra CUSTOS_CONVOLUCAO medindo cada método nesta máquina
+    
+    Args:
+        tamanho (int): Lado da imagem de teste
+        tamanho_mascara (int): Lado da máscara de teste
+        repeticoes (int): Medições por método (usa a menor)
+        
+    Returns:
+        dict: Custos calibrados (também gravados em CUSTOS_CONVOLUCAO)
+    """
+    rng = np.random.default_rng(0)
+    tipo = tipo_calculo()
+    imagem = rng.random((tamanho, tamanho), dtype=tipo)
+    mascara = rng.random((tamanho_mascara, tamanho_mascara), dtype=tipo)
+    vetor = rng.random(tamanho_mascara, dtype=tipo)
+    
+    def medir(funcao, *args):
+        tempos = []
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            funcao(*args)
+            tempos.append(time.perf_counter() - inicio)
+        return min(tempos)
+    
+    pixels = tamanho * tamanho
+    pontos_fft = _tamanho_fft(tamanho + tamanho_mascara - 1) ** 2
+    
+    # Custo fixo da FFT medido com uma imagem mínima
+    fixo_fft = medir(_convolucao_fft, imagem[:8, :8], mascara[:3, :3])
+    
+    CUSTOS_CONVOLUCAO['direta'] = medir(_convolucao_direta, imagem, mascara) / (pixels * mascara.size)
+    CUSTOS_CONVOLUCAO['separavel'] = (medir(_convolucao_separavel, imagem, vetor, vetor) /
+                                      (pixels * 2 * tamanho_mascara))
+    CUSTOS_CONVOLUCAO['fft'] = float((medir(_convolucao_fft, imagem, mascara) - fixo_fft) /
+                                     (pontos_fft * np.log2(pontos_fft)))
+    CUSTOS_CONVOLUCAO['fixo_fft'] = fixo_fft
+    
+    return dict(CUSTOS_CONVOLUCAO)
+
+
+def convolucao(imagem, mascara, metodo='auto'):
+    """
+    Convolução 2D com padding de zeros
+    
+    Args:
+        imagem (numpy.ndarray): Imagem em escala de cinza
+        mascara (numpy.ndarray): Máscara 2D
+        metodo (str): 'auto' (escolhe pelo modelo de custo), 'direta',
+                      'separavel' ou 'fft'
+        
+    Returns:
+        numpy.ndarray: Imagem convoluída (tipo de cálculo da política de precisão)
+    """
+    if metodo not in ('auto', 'direta', 'separavel', 'fft'):
+        raise ValueError(f"Método de convolução desconhecido: {metodo}")
+    
+    fatores = None
+    if metodo in ('auto', 'separavel'):
+        fatores = decompor_separavel(mascara)
+        if fatores is None and metodo == 'separavel':
+            raise ValueError("Máscara não é separável")
+    
+    if metodo == 'auto':
+        metodo = escolher_metodo_convolucao(imagem.shape, mascara, separavel=fatores is not None)
+    
+    # Imagem e máscara no tipo de cálculo: a acumulação não promove para float64
+    tipo = tipo_calculo()
+    imagem = imagem.astype(tipo, copy=False)
+    mascara = mascara.astype(tipo, copy=False)
+    if fatores is not None:
+        fatores = tuple(f.astype(tipo, copy=False) for f in fatores)
+    
+    if metodo == 'separavel':
+        resultado = _convolucao_separavel(imagem, *fatores)
+    elif metodo == 'fft':
+        resultado = _convolucao_fft(imagem, mascara)
+    else:
+        resultado = _convolucao_direta(imagem, mascara)
+    
+    return resultado.astype(tipo, copy=False)
+
+
+def correlacao(imagem, mascara, metodo='auto'):
+    # Correlação = convolução com a máscara rotacionada 180°
+    # (mesmo padding, inclusive para máscaras de tamanho par)
+    return convolucao(imagem, np.flip(mascara), metodo=metodo)
+
+
+def reduzir_imagem(imagem, fator):
+    """
+    Reduz a imagem por um fator inteiro (média de blocos fator x fator)
+    
+    Linhas e colunas que não completam um bloco são descartadas.
+    
+    Args:
+        imagem (numpy.ndarray): Imagem em escala de cinza
+        fator (int): Fator de redução
+        
+    Returns:
+        numpy.ndarray: Imagem reduzida (tipo de cálculo da política de precisão)
+    """
+    if fator <= 1:
+        return imagem.astype(tipo_calculo(), copy=False)
+    
+    altura = imagem.shape[0] // fator
+    largura = imagem.shape[1] // fator
+    blocos = imagem[:altura * fator, :largura * fator].reshape(altura, fator, largura, fator)
+    
+    return blocos.mean(axis=(1, 3), dtype=tipo_calculo())
 
 
 def criar_histograma(imagem):
-    histograma = np.zeros(256, dtype=int)
+    # uint8: contagem em uma única passada, sem cópia para int
+    if imagem.dtype == np.uint8:
+        return np.bincount(imagem.ravel(), minlength=256)
+    
+    # Demais tipos: truncar para inteiro e ignorar valores fora de 0-255
+    valores = imagem.astype(np.intp, copy=False).ravel()
+    valores = valores[(valores >= 0) & (valores < 256)]
+    
+    return np.bincount(valores, minlength=256)
+
+
+def estatisticas_imagem(imagem, max_niveis=65536):
+    """
+    Calcula mínimo, máximo, média, desvio padrão e número de níveis únicos
+    
+    Para imagens de níveis inteiros (uint8, inteiros ou floats com valores
+    inteiros) todas as estatísticas saem de um único histograma, sem
+    ordenar a imagem. Demais imagens usam o cálculo direto.
+    
+    Args:
+        imagem (numpy.ndarray): Imagem em escala de cinza
+        max_niveis (int): Maior faixa (max - min + 1) contada por histograma
+        
+    Returns:
+        dict: Chaves 'min', 'max', 'media', 'desvio' e 'niveis_unicos'
+    """
+    if imagem.size == 0:
+        raise ValueError("Imagem vazia")
+    
+    histograma = None
+    
+    if imagem.dtype == np.uint8:
+        histograma = criar_histograma(imagem)
+        base = 0
+    else:
+        minimo = imagem.min()
+        maximo = imagem.max()
+        
+        if imagem.dtype.kind in 'iu' and int(maximo) - int(minimo) < max_niveis:
+            niveis = imagem.astype(np.intp) - int(minimo)
+            histograma = np.bincount(niveis.ravel(), minlength=int(maximo) - int(minimo) + 1)
+            base = int(minimo)
+        elif imagem.dtype.kind == 'f' and np.isfinite(minimo) and np.isfinite(maximo) \
+                and maximo - minimo < max_niveis:
+            # Deslocar para 0 e conferir se todos os valores são inteiros
+            deslocada = imagem - minimo
+            niveis = deslocada.astype(np.intp)
+            if np.array_equal(niveis, deslocada):
+                histograma = np.bincount(niveis.ravel(), minlength=int(maximo - minimo) + 1)
+                base = minimo
+    
+    if histograma is None:
+        return {
+            'min': minimo,
+            'max': maximo,
+            'media': imagem.mean(),
+            'desvio': imagem.std(),
+            'niveis_unicos': len(np.unique(imagem))
+        }
+    
+    ocupados = np.flatnonzero(histograma)
+    valores = np.arange(len(histograma), dtype=np.float64) + float(base)
+    total = histograma.sum()
     
-    imagem_int = imagem.astype(int)
+    media = np.dot(histograma, valores) / total
+    variancia = np.dot(histograma, (valores - media) ** 2) / total
     
-    for valor in range(256):
-        histograma[valor] = np.sum(imagem_int == valor)
+    # Mesmos tipos de mean()/std(): o da imagem se for float, senão float64
+    tipo = imagem.dtype.type if imagem.dtype.kind == 'f' else np.float64
     
-    return histograma
+    return {
+        'min': imagem.dtype.type(valores[ocupados[0]]),
+        'max': imagem.dtype.type(valores[ocupados[-1]]),
+        'media': tipo(media),
+        'desvio': tipo(np.sqrt(variancia)),
+        'niveis_unicos': len(ocupados)
+    }
@@ -0,0 +1,123 @@
+"""
+Progresso e cancelamento cooperativo das operações
+
+Os algoritmos chamam reportar_progresso() nos seus laços externos e entre
+etapas. Fora de uma tarefa monitorada a chamada não faz nada; dentro de
+uma (ver monitorar), atualiza a fração concluída do MonitorProgresso da
+thread atual e lança OperacaoCancelada se o cancelamento foi pedido.
+"""
+
+import threading
+from contextlib import contextmanager
+
+
+class OperacaoCancelada(Exception):
+    """
+    Lançada por reportar_progresso quando a tarefa foi cancelada
+    """
+
+
+class MonitorProgresso:
+    """
+    Estado de progresso de uma tarefa, lido pela interface
+
+    A fração e a etapa são escritas pela thread da tarefa e apenas lidas
+    pelas demais; o cancelamento é um threading.Event.
+    """
+
+    def __init__(self):
+        self.fracao = 0.0
+        self.etapa = ""
+        self.cancelado = threading.Event()
+        # Faixa [inicio, fim] da etapa atual dentro do progresso total
+        self.faixa = (0.0, 1.0)
+
+    def cancelar(self):
+        self.cancelado.set()
+
+    def atualizar(self, fracao=None, etapa=None):
+        if fracao is not None:
+            inicio, fim = self.faixa
+            fracao = inicio + (fim - inicio) * min(max(fracao, 0.0), 1.0)
+            # Progresso nunca regride (etapas repetidas, subetapas aninhadas)
+            self.fracao = max(self.fracao, fracao)
+        if etapa is not None:
+            self.etapa = etapa
+
+
+_local = threading.local()
+
+
+def monitor_atual():
+    # Monitor da thread atual (None fora de uma tarefa monitorada)
+    return getattr(_local, 'monitor', None)
+
+
+@contextmanager
+def monitorar(monitor):
+    """
+    Associa um monitor à thread atual durante o bloco
+
+    Args:
+        monitor (MonitorProgresso): Monitor da tarefa
+    """
+    anterior = monitor_atual()
+    _local.monitor = monitor
+    try:
+        yield monitor
+    finally:
+        _local.monitor = anterior
+
+
+def reportar_progresso(fracao=None, etapa=None):
+    """
+    Informa o progresso da etapa atual e verifica o cancelamento
+
+    Args:
+        fracao (float, opcional): Fração concluída (0 a 1) da etapa atual;
+                                  None apenas verifica o cancelamento
+        etapa (str, opcional): Descrição da etapa
+
+    Raises:
+        OperacaoCancelada: Se o cancelamento da tarefa foi pedido
+    """
+    monitor = getattr(_local, 'monitor', None)
+    if monitor is None:
+        return
+
+    monitor.atualizar(fracao, etapa)
+
+    if monitor.cancelado.is_set():
+        raise OperacaoCancelada()
+
+
+@contextmanager
+def subetapa(inicio, fim, etapa=None):
+    """
+    Mapeia o progresso reportado dentro do bloco para [inicio, fim]
+
+    Permite que uma função que reporta de 0 a 1 (ex.: convolução) seja
+    usada como parte de uma operação maior.
+
+    Args:
+        inicio (float): Fração da etapa atual onde o bloco começa
+        fim (float): Fração da etapa atual onde o bloco termina
+        etapa (str, opcional): Descrição do bloco
+    """
+    monitor = getattr(_local, 'monitor', None)
+    if monitor is None:
+        yield
+        return
+
+    anterior = monitor.faixa
+    a, b = anterior
+    monitor.atualizar(inicio, etapa)
+    monitor.faixa = (a + (b - a) * inicio, a + (b - a) * fim)
+    try:
+        yield
+    finally:
+        monitor.faixa = anterior
+
+    monitor.atualizar(fim)
+    if monitor.cancelado.is_set():
+        raise OperacaoCancelada()
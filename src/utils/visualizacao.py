@@ -1,23 +1,146 @@
+import weakref
+
 import numpy as np
 from PIL import Image, ImageTk
 import matplotlib.pyplot as plt
 
 
-def array_para_photoimage(imagem_array):
-    # Normalizar se necessário
+def _para_uint8(imagem_array):
+    # Normalizar se necessário (uint8 é usado sem cópia)
+    if imagem_array.dtype == np.uint8:
+        return imagem_array
+    
     if imagem_array.max() > 255 or imagem_array.min() < 0:
         imagem_array = np.clip(imagem_array, 0, 255)
     
-    imagem_array = imagem_array.astype(np.uint8)
+    return imagem_array.astype(np.uint8)
+
+
+def colorir_rotulos(rotulos, linhas=None):
+    """
+    Gera imagem em tons de cinza de uma imagem rotulada
+    
+    Args:
+        rotulos (numpy.ndarray): Rótulos (0 = fundo)
+        linhas (numpy.ndarray, opcional): Máscara de linhas desenhadas em branco
+        
+    Returns:
+        numpy.ndarray: Regiões em tons de cinza (uint8), fundo em 0 e
+                       linhas em 255
+    """
+    # Tons espalhados para que regiões vizinhas fiquem distinguíveis
+    resultado = np.where(rotulos > 0, 40 + (rotulos.astype(np.int64) * 67) % 176, 0)
+    if linhas is not None:
+        resultado[linhas > 0] = 255
+    
+    return resultado.astype(np.uint8)
+
+
+class PiramideExibicao:
+    """
+    Pirâmide de resoluções de uma imagem para exibição
+    
+    O nível 0 é a imagem convertida para uint8 (ou copiada, se já for
+    uint8) uma única vez, sem referenciar o array original; cada nível
+    seguinte é criado sob demanda com metade da resolução (Image.reduce,
+    média de blocos 2x2). Uma miniatura parte do menor nível ainda maior
+    que o tamanho pedido e usa BILINEAR; com alta_qualidade, usa LANCZOS
+    sobre o nível 0. As miniaturas geradas ficam em cache.
+    """
+    
+    def __init__(self, imagem_array):
+        self.forma = imagem_array.shape[:2]
+        nivel0 = _para_uint8(imagem_array)
+        if nivel0 is imagem_array:
+            # Cópia própria: a imagem PIL guardaria o array e o cache
+            # (ver obter_piramide) nunca o liberaria
+            nivel0 = nivel0.copy()
+        self.niveis = [Image.fromarray(nivel0)]
+        self.miniaturas = {}
     
-    # Converter para PIL Image
-    img_pil = Image.fromarray(imagem_array)
+    def nivel_para(self, largura, altura):
+        """
+        Retorna o menor nível com pelo menos largura x altura pixels
+        
+        Args:
+            largura (int): Largura desejada
+            altura (int): Altura desejada
+            
+        Returns:
+            PIL.Image.Image: Nível da pirâmide
+        """
+        nivel = self.niveis[-1]
+        while nivel.width // 2 >= largura and nivel.height // 2 >= altura:
+            nivel = nivel.reduce(2)
+            self.niveis.append(nivel)
+        
+        for nivel in reversed(self.niveis):
+            if nivel.width >= largura and nivel.height >= altura:
+                return nivel
+        
+        return self.niveis[0]
     
-    # Converter para PhotoImage
-    return ImageTk.PhotoImage(img_pil)
+    def miniatura(self, largura, altura, alta_qualidade=False):
+        """
+        Imagem redimensionada para largura x altura (com cache)
+        
+        Args:
+            largura (int): Largura da miniatura
+            altura (int): Altura da miniatura
+            alta_qualidade (bool): LANCZOS a partir da resolução original
+            
+        Returns:
+            PIL.Image.Image: Miniatura
+        """
+        chave = (largura, altura, alta_qualidade)
+        
+        if chave not in self.miniaturas:
+            if (largura, altura) == self.niveis[0].size:
+                imagem = self.niveis[0]
+            elif alta_qualidade:
+                imagem = self.niveis[0].resize((largura, altura), Image.LANCZOS)
+            else:
+                imagem = self.nivel_para(largura, altura).resize((largura, altura), Image.BILINEAR)
+            self.miniaturas[chave] = imagem
+        
+        return self.miniaturas[chave]
+
+
+# Pirâmides das imagens exibidas, por identidade do array. A entrada é
+# removida quando o array deixa de existir; arrays exibidos não devem
+# ser modificados in place.
+_piramides = {}
+
+
+def obter_piramide(imagem_array):
+    """
+    Retorna a pirâmide de exibição do array, criando-a na primeira vez
+    
+    Args:
+        imagem_array (numpy.ndarray): Imagem em escala de cinza
+        
+    Returns:
+        PiramideExibicao: Pirâmide compartilhada por todas as exibições do array
+    """
+    chave = id(imagem_array)
+    entrada = _piramides.get(chave)
+    
+    if entrada is not None and entrada[0]() is imagem_array:
+        return entrada[1]
+    
+    piramide = PiramideExibicao(imagem_array)
+    referencia = weakref.ref(imagem_array, lambda _, chave=chave: _piramides.pop(chave, None))
+    _piramides[chave] = (referencia, piramide)
+    
+    return piramide
+
+
+def array_para_photoimage(imagem_array):
+    # Nível 0 da pirâmide (conversão para uint8 feita uma única vez)
+    return ImageTk.PhotoImage(obter_piramide(imagem_array).niveis[0])
 
 
-def redimensionar_imagem(imagem, max_largura=400, max_altura=400):
+def redimensionar_imagem(imagem, max_largura=400, max_altura=400, alta_qualidade=True):
     altura, largura = imagem.shape
     
     # Calcular proporção
@@ -29,11 +152,11 @@ def redimensionar_imagem(imagem, max_largura=400, max_altura=400):
     nova_largura = int(largura * proporcao)
     nova_altura = int(altura * proporcao)
     
-    # Usar PIL para redimensionar
-    img_pil = Image.fromarray(imagem.astype(np.uint8))
-    img_redimensionada = img_pil.resize((nova_largura, nova_altura), Image.LANCZOS)
+    # Miniatura da pirâmide (LANCZOS por padrão, como antes; reutilizada
+    # em chamadas repetidas com a mesma imagem)
+    miniatura = obter_piramide(imagem).miniatura(nova_largura, nova_altura, alta_qualidade)
     
-    return np.array(img_redimensionada)
+    return np.array(miniatura)
 
 
 def plotar_histograma(imagem, titulo="Histograma"):
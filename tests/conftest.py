@@ -0,0 +1,29 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Os módulos do projeto são importados a partir de src/ (como em main.py)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+
+@pytest.fixture
+def imagem():
+    # Imagem 8 bits pequena e reprodutível com bordas e ruído
+    rng = np.random.default_rng(0)
+    img = np.zeros((48, 64), dtype=np.float64)
+    img[10:30, 12:40] = 180
+    img[20:44, 30:58] += 60
+    img += rng.normal(0, 8, img.shape)
+    return np.clip(img, 0, 255).astype(np.uint8)
+
+
+@pytest.fixture
+def precisao_float64():
+    # Cálculos em float64 durante o teste (comparação com referências exatas)
+    from utils import POLITICA_PRECISAO, definir_precisao
+    anterior = dict(POLITICA_PRECISAO)
+    definir_precisao(calculo=np.float64)
+    yield
+    definir_precisao(**anterior)
@@ -0,0 +1,112 @@
+import numpy as np
+import pytest
+
+from algoritmos import CadeiaFreeman, IndiceFormas, contar_objetos, desserializar_cadeia, serializar_cadeia
+
+
+def objetos_separados():
+    # Formas variadas separadas por pelo menos 2 pixels de fundo
+    binaria = np.zeros((30, 40), dtype=np.uint8)
+    binaria[2:8, 2:10] = 255
+    binaria[3, 20] = 255
+    binaria[12:20, 4:12] = 255
+    binaria[14:18, 6:10] = 0
+    binaria[10:26, 18:20] = 255
+    binaria[24:26, 18:30] = 255
+    for k in range(8):
+        binaria[12 + k, 30 + k // 2:38 - k // 2] = 255
+    return binaria
+
+
+def test_todos_equivale_a_objeto_isolado():
+    freeman = CadeiaFreeman()
+    binaria = objetos_separados()
+    resultados = freeman.aplicar_todos(binaria)
+    
+    _, rotulos = contar_objetos(binaria)
+    assert len(resultados) == rotulos.max()
+    for resultado in resultados:
+        isolado = np.where(rotulos == resultado['rotulo'], 255, 0).astype(np.uint8)
+        esperado = freeman.aplicar(isolado)
+        assert resultado['ponto_inicial'] == esperado['contorno'][0]
+        assert resultado['contorno'] == esperado['contorno']
+        assert resultado['codigo'] == esperado['codigo']
+
+
+def test_todos_area_minima():
+    freeman = CadeiaFreeman()
+    binaria = objetos_separados()
+    resultados = freeman.aplicar_todos(binaria, area_minima=2)
+    # O pixel isolado é descartado
+    assert len(resultados) == len(freeman.aplicar_todos(binaria)) - 1
+    assert all(len(r['codigo']) > 0 for r in resultados)
+
+
+@pytest.mark.parametrize('semente', range(5))
+def test_menor_rotacao_equivale_a_forca_bruta(semente):
+    freeman = CadeiaFreeman()
+    rng = np.random.default_rng(semente)
+    # Poucos símbolos para forçar empates e rotações repetidas
+    codigo = rng.integers(0, 3, rng.integers(1, 40)).tolist()
+    rotacoes = [codigo[k:] + codigo[:k] for k in range(len(codigo))]
+    assert freeman.normalizar_codigo(codigo) == min(rotacoes)
+
+
+def test_menor_rotacao_periodica():
+    freeman = CadeiaFreeman()
+    assert freeman.normalizar_codigo([1, 0, 1, 0, 1, 0]) == [0, 1, 0, 1, 0, 1]
+    assert freeman.normalizar_codigo([]) == []
+
+
+def test_primeira_diferenca_circular():
+    freeman = CadeiaFreeman()
+    codigo = np.random.default_rng(20).integers(0, 8, 50).tolist()
+    esperado = [(codigo[(k + 1) % len(codigo)] - codigo[k]) % 8 for k in range(len(codigo))]
+    assert freeman.primeira_diferenca(codigo) == esperado
+    assert freeman.primeira_diferenca([3]) == []
+
+
+@pytest.mark.parametrize('n', [0, 1, 7, 8, 101])
+def test_serializacao_ida_e_volta(n):
+    codigo = np.random.default_rng(n).integers(0, 8, n).tolist()
+    dados = serializar_cadeia((12, 345), codigo)
+    assert len(dados) == 16 + (3 * n + 7) // 8
+    assert desserializar_cadeia(dados) == ((12, 345), codigo)
+
+
+def test_serializacao_dados_invalidos():
+    with pytest.raises(ValueError):
+        serializar_cadeia((0, 0), [1, 8])
+    with pytest.raises(ValueError):
+        desserializar_cadeia(b'FC')
+    with pytest.raises(ValueError):
+        desserializar_cadeia(b'XX' + serializar_cadeia((0, 0), [1, 2])[2:])
+
+
+def test_reconstruir_contorno():
+    freeman = CadeiaFreeman()
+    for resultado in freeman.aplicar_todos(objetos_separados()):
+        reconstruido = freeman.reconstruir_contorno(resultado['ponto_inicial'], resultado['codigo'])
+        assert reconstruido == resultado['contorno']
+
+
+def test_indice_formas():
+    freeman = CadeiaFreeman()
+    indice = IndiceFormas()
+    binaria = objetos_separados()
+    resultados = freeman.aplicar_todos(binaria, area_minima=2)
+    for r in resultados:
+        indice.adicionar(r['rotulo'], r['codigo'])
+    assert len(indice) == len(resultados)
+    
+    # O mesmo código a partir de outro ponto inicial tem a mesma chave
+    codigo = resultados[0]['codigo']
+    girado = codigo[5:] + codigo[:5]
+    assert indice.buscar(girado) == [resultados[0]['rotulo']]
+    assert indice.buscar([0, 0, 2, 4, 4, 6]) == []
+    
+    # Busca por prefixo equivale a comparar com todas as chaves
+    for tamanho in (1, 3, 6):
+        prefixo = indice.chave(codigo)[:tamanho]
+        esperado = [r['rotulo'] for r in resultados if indice.chave(r['codigo']).startswith(prefixo)]
+        assert sorted(indice.buscar_prefixo(codigo, tamanho)) == sorted(esperado)
@@ -0,0 +1,178 @@
+import numpy as np
+import pytest
+
+from algoritmos import Canny, MarrHildreth
+
+
+def degrau(forma):
+    # Degrau de intensidade 40 → 200 ao longo da reta dada por forma
+    n = 96
+    i, j = np.mgrid[:n, :n]
+    regiao = {'vertical': j > n // 2, 'diagonal \\': j > i, 'diagonal /': i + j > n}[forma]
+    return np.where(regiao, 200, 40).astype(np.uint8)
+
+
+def espessura(bordas):
+    # Pixels de borda por linha, longe das margens da imagem
+    return (bordas[10:-10, 10:-10] > 0).sum(axis=1).mean()
+
+
+@pytest.mark.parametrize('forma', ['vertical', 'diagonal \\', 'diagonal /'])
+def test_supressao_interpolada_afina_bordas(forma):
+    bordas = Canny(interpolacao=True).aplicar(degrau(forma))
+    assert 1.0 <= espessura(bordas) <= 2.5
+
+
+def test_supressao_discreta_borda_vertical():
+    assert espessura(Canny().aplicar(degrau('vertical'))) == 1.0
+
+
+def cruzamentos_referencia(imagem_log, threshold_abs):
+    # Laço original: 4 pares de vizinhos opostos por pixel interior
+    altura, largura = imagem_log.shape
+    bordas = np.zeros((altura, largura), dtype=np.uint8)
+    for i in range(1, altura - 1):
+        for j in range(1, largura - 1):
+            pixel = imagem_log[i, j]
+            for vizinho in (imagem_log[i, j - 1], imagem_log[i - 1, j],
+                            imagem_log[i - 1, j - 1], imagem_log[i - 1, j + 1]):
+                if pixel * vizinho < 0 and abs(pixel - vizinho) > threshold_abs:
+                    bordas[i, j] = 255
+                    break
+    return bordas
+
+
+@pytest.mark.parametrize('threshold_abs', [0.0, 0.5, 2.0])
+def test_cruzamentos_zero_equivalem_ao_laco(threshold_abs):
+    imagem_log = np.random.default_rng(4).normal(size=(30, 40))
+    imagem_log[5, 5] = 0.0
+    bordas = MarrHildreth().encontrar_cruzamentos_zero(imagem_log, threshold_abs)
+    assert np.array_equal(bordas, cruzamentos_referencia(imagem_log, threshold_abs))
+
+
+def test_cruzamentos_zero_imagem_pequena():
+    assert not MarrHildreth().encontrar_cruzamentos_zero(np.ones((2, 5)), 0).any()
+
+
+def test_marr_hildreth_detecta_degrau():
+    bordas = MarrHildreth(sigma=1.5).aplicar(degrau('vertical'))
+    colunas = np.flatnonzero(bordas[48])
+    # Degrau entre as colunas 48 e 49 (a máscara 9x9 truncada gera
+    # cruzamentos secundários próximos)
+    assert {48, 49} & set(colunas) and np.all(np.abs(colunas - 48.5) <= 5)
+
+
+def supressao_referencia(magnitude, direcao):
+    # Laço original com os 4 setores de ângulo
+    altura, largura = magnitude.shape
+    resultado = np.zeros((altura, largura))
+    angulo = np.rad2deg(direcao) % 180
+    for i in range(1, altura - 1):
+        for j in range(1, largura - 1):
+            ang = angulo[i, j]
+            if (0 <= ang < 22.5) or (157.5 <= ang <= 180):
+                v1, v2 = magnitude[i, j - 1], magnitude[i, j + 1]
+            elif 22.5 <= ang < 67.5:
+                v1, v2 = magnitude[i - 1, j + 1], magnitude[i + 1, j - 1]
+            elif 67.5 <= ang < 112.5:
+                v1, v2 = magnitude[i - 1, j], magnitude[i + 1, j]
+            else:
+                v1, v2 = magnitude[i - 1, j - 1], magnitude[i + 1, j + 1]
+            if magnitude[i, j] >= v1 and magnitude[i, j] >= v2:
+                resultado[i, j] = magnitude[i, j]
+    return resultado
+
+
+def test_supressao_discreta_equivale_ao_laco():
+    rng = np.random.default_rng(5)
+    magnitude = rng.random((25, 35))
+    direcao = rng.uniform(-np.pi, np.pi, magnitude.shape)
+    direcao[0, :5] = [0, np.pi / 8, np.pi / 4, 3 * np.pi / 8, np.pi]
+    assert np.array_equal(Canny().supressao_nao_maxima(magnitude, direcao),
+                          supressao_referencia(magnitude, direcao))
+
+
+def test_supressao_interpolada_coincide_nos_eixos():
+    rng = np.random.default_rng(6)
+    magnitude = rng.random((20, 20))
+    for angulo in (0.0, np.pi / 2, np.pi):
+        direcao = np.full(magnitude.shape, angulo)
+        assert np.allclose(Canny().supressao_nao_maxima(magnitude, direcao, interpolacao=True),
+                           supressao_referencia(magnitude, direcao))
+
+
+def histerese_referencia(magnitude, baixo, alto):
+    # Reexame repetido da imagem até nenhuma borda fraca ser incorporada
+    altura, largura = magnitude.shape
+    fracas = (magnitude >= baixo) & (magnitude < alto)
+    resultado = (magnitude >= alto).astype(np.uint8)
+    alterado = True
+    while alterado:
+        alterado = False
+        for i in range(1, altura - 1):
+            for j in range(1, largura - 1):
+                if fracas[i, j] and not resultado[i, j] and resultado[i - 1:i + 2, j - 1:j + 2].any():
+                    resultado[i, j] = 1
+                    alterado = True
+    return resultado * 255
+
+
+@pytest.mark.parametrize('semente', [7, 8, 9])
+def test_histerese_equivale_ao_reexame(semente):
+    magnitude = np.random.default_rng(semente).random((30, 30))
+    bordas = Canny().dupla_limiarizacao_histerese(magnitude, 0.5, 0.9)
+    assert np.array_equal(bordas, histerese_referencia(magnitude, 0.5, 0.9))
+
+
+def test_histerese_segue_cadeia_longa():
+    # Cadeia em U de bordas fracas ligada a um único pixel forte
+    magnitude = np.zeros((21, 21))
+    magnitude[1:-1, 1] = magnitude[-2, 1:-1] = magnitude[1:-1, -2] = 0.5
+    magnitude[1, 1] = 1.0
+    bordas = Canny().dupla_limiarizacao_histerese(magnitude, 0.4, 0.9)
+    assert np.array_equal(bordas > 0, magnitude > 0)
+
+
+def test_canny_reaproveita_etapas(imagem):
+    canny = Canny()
+    canny.aplicar(imagem)
+    suavizada, suprimida = canny.etapas['suavizada'], canny.etapas['suprimida']
+    
+    # Só os limiares mudaram: nenhuma etapa é refeita
+    canny.threshold_low, canny.threshold_high = 0.1, 0.3
+    bordas = canny.aplicar(imagem)
+    assert canny.etapas['suavizada'] is suavizada and canny.etapas['suprimida'] is suprimida
+    assert np.array_equal(bordas, Canny(threshold_low=0.1, threshold_high=0.3).aplicar(imagem))
+    
+    # Interpolação: apenas a supressão é refeita
+    canny.interpolacao = True
+    bordas = canny.aplicar(imagem)
+    assert canny.etapas['suavizada'] is suavizada and canny.etapas['suprimida'] is not suprimida
+    assert np.array_equal(bordas, Canny(threshold_low=0.1, threshold_high=0.3,
+                                        interpolacao=True).aplicar(imagem))
+    
+    # Sigma ou outra imagem: tudo é refeito
+    canny.sigma = 2.0
+    bordas = canny.aplicar(imagem)
+    assert canny.etapas['suavizada'] is not suavizada
+    assert np.array_equal(bordas, Canny(sigma=2.0, threshold_low=0.1, threshold_high=0.3,
+                                        interpolacao=True).aplicar(imagem))
+    suavizada = canny.etapas['suavizada']
+    canny.aplicar(imagem.copy())
+    assert canny.etapas['suavizada'] is not suavizada
+
+
+def test_marr_reaproveita_log(imagem):
+    marr = MarrHildreth()
+    marr.aplicar(imagem)
+    log = marr.etapas['log']
+    
+    marr.threshold = 0.2
+    bordas = marr.aplicar(imagem)
+    assert marr.etapas['log'] is log
+    assert np.array_equal(bordas, MarrHildreth(threshold=0.2).aplicar(imagem))
+    
+    marr.sigma = 2.5
+    bordas = marr.aplicar(imagem)
+    assert marr.etapas['log'] is not log
+    assert np.array_equal(bordas, MarrHildreth(sigma=2.5, threshold=0.2).aplicar(imagem))
@@ -0,0 +1,35 @@
+import numpy as np
+
+from algoritmos import FiltroBox
+
+
+def test_integral_equivale_ao_manual(imagem):
+    box = FiltroBox()
+    for tamanho in (2, 3, 5, 7):
+        manual = box.aplicar(imagem, tamanho, modo='manual').astype(int)
+        integral = box.aplicar(imagem, tamanho, modo='integral').astype(int)
+        # Somas em ordens diferentes: truncamento pode diferir em 1 nível
+        assert np.abs(manual - integral).max() <= 1
+
+
+def test_multiplos_reutilizam_integral(imagem, monkeypatch):
+    box = FiltroBox()
+    original = box.criar_imagem_integral
+    chamadas = []
+    
+    def espiao(img):
+        chamadas.append(img)
+        return original(img)
+    
+    monkeypatch.setattr(box, 'criar_imagem_integral', espiao)
+    resultados = box.aplicar_multiplos(imagem, [3, 5, 7])
+    
+    # Uma única imagem integral para todos os tamanhos
+    assert len(chamadas) == 1
+    for tamanho, resultado in resultados.items():
+        assert np.array_equal(resultado, FiltroBox().aplicar(imagem, tamanho))
+
+
+def test_aviso_imagem_grande_no_modo_integral(capsys):
+    FiltroBox().aplicar(np.zeros((8, 1100), dtype=np.uint8), 3)
+    assert "AVISO: Imagem grande" in capsys.readouterr().out
@@ -0,0 +1,139 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+pytest.importorskip('tkinter')
+
+from interface.janela_principal import (
+    LADO_PREVIA, MAX_LINHAS_CONSOLE, SIGMA_MINIMO_PREVIA, ConsoleRedirect,
+    JanelaPrincipal, fator_previa, ordenar_limiares, sigma_previa
+)
+from utils import reduzir_imagem
+
+
+class VariavelFalsa:
+    # Substitui tk.DoubleVar (sem display nos testes)
+    def __init__(self, valor):
+        self.valor = valor
+    
+    def get(self):
+        return self.valor
+    
+    def set(self, valor):
+        self.valor = valor
+
+
+def janela_falsa(**parametros):
+    agendados = []
+    janela = SimpleNamespace(
+        parametros={tipo: {nome: VariavelFalsa(v) for nome, v in valores.items()}
+                    for tipo, valores in parametros.items()},
+        agendar_recalculo=agendados.append)
+    return janela, agendados
+
+
+def test_ordenar_limiares():
+    assert ordenar_limiares(0.1, 0.3, 'threshold_low') == (0.1, 0.3)
+    assert ordenar_limiares(0.4, 0.3, 'threshold_low') == (0.4, 0.4)
+    assert ordenar_limiares(0.4, 0.3, 'threshold_high') == (0.3, 0.3)
+
+
+def test_controles_mantem_tl_menor_que_th():
+    janela, agendados = janela_falsa(canny={'sigma': 1.4, 'threshold_low': 0.45,
+                                            'threshold_high': 0.2})
+    JanelaPrincipal.alterar_parametro(janela, 'canny', 'threshold_low')
+    assert janela.parametros['canny']['threshold_high'].get() == 0.45
+    
+    janela.parametros['canny']['threshold_high'].set(0.1)
+    JanelaPrincipal.alterar_parametro(janela, 'canny', 'threshold_high')
+    assert janela.parametros['canny']['threshold_low'].get() == 0.1
+    assert agendados == ['canny', 'canny']
+
+
+def test_controles_sem_limiares_duplos():
+    janela, agendados = janela_falsa(marr={'sigma': 1.5, 'threshold': 0.04})
+    JanelaPrincipal.alterar_parametro(janela, 'marr', 'threshold')
+    assert janela.parametros['marr']['threshold'].get() == 0.04
+    assert agendados == ['marr']
+
+
+class TextoFalso:
+    # Subconjunto de tk.Text usado pelo console: inserção no fim, índice
+    # 'end-1c', remoção de linhas inteiras e after() registrado sem executar
+    def __init__(self):
+        self.texto = ""
+        self.insercoes = 0
+        self.agendados = []
+    
+    def after(self, intervalo_ms, funcao):
+        self.agendados.append((intervalo_ms, funcao))
+    
+    def insert(self, indice, texto):
+        self.texto += texto
+        self.insercoes += 1
+    
+    def index(self, indice):
+        linhas = self.texto.split('\n')
+        return f"{len(linhas)}.{len(linhas[-1])}"
+    
+    def delete(self, inicio, fim):
+        linha_fim = int(fim.split('.')[0])
+        self.texto = '\n'.join(self.texto.split('\n')[linha_fim - 1:])
+    
+    def see(self, indice):
+        pass
+    
+    def descarregar(self):
+        # Executa o próximo descarregamento agendado
+        _, funcao = self.agendados.pop(0)
+        funcao()
+
+
+def test_console_acumula_ate_descarregar():
+    widget = TextoFalso()
+    console = ConsoleRedirect(widget, intervalo_ms=100)
+    assert [intervalo for intervalo, _ in widget.agendados] == [100]
+    
+    for k in range(3):
+        print(f"linha {k}", file=console)
+    console.flush()
+    assert widget.texto == "" and widget.insercoes == 0
+    
+    # Uma única inserção para todo o texto acumulado; novo descarregamento agendado
+    widget.descarregar()
+    assert widget.texto == "linha 0\nlinha 1\nlinha 2\n"
+    assert widget.insercoes == 1 and len(widget.agendados) == 1
+    
+    # Nada acumulado: o widget não é tocado
+    widget.descarregar()
+    assert widget.insercoes == 1 and len(widget.agendados) == 1
+
+
+def test_console_limita_linhas():
+    widget = TextoFalso()
+    console = ConsoleRedirect(widget)
+    for k in range(MAX_LINHAS_CONSOLE + 1500):
+        console.write(f"linha {k}\n")
+    widget.descarregar()
+    
+    linhas = widget.texto.split('\n')
+    assert int(widget.index('end-1c').split('.')[0]) == MAX_LINHAS_CONSOLE
+    assert linhas[-2] == f"linha {MAX_LINHAS_CONSOLE + 1499}"
+
+
+@pytest.mark.parametrize('forma', [(300, 400), (512, 512), (513, 100), (1080, 1920), (4000, 3001)])
+def test_fator_previa_limita_lado(forma):
+    fator = fator_previa(forma)
+    reduzida = reduzir_imagem(np.zeros(forma, dtype=np.uint8), fator)
+    assert max(reduzida.shape) <= LADO_PREVIA
+    # Menor fator possível: com fator - 1 o maior lado passaria do limite
+    assert fator == 1 or max(forma) // (fator - 1) > LADO_PREVIA
+
+
+@pytest.mark.parametrize('sigma', [0.5, 1.4, 5.0])
+@pytest.mark.parametrize('fator', [2, 4, 8, 16])
+def test_sigma_previa_tem_minimo(sigma, fator):
+    reduzido = sigma_previa(sigma, fator)
+    assert reduzido >= SIGMA_MINIMO_PREVIA
+    assert reduzido == pytest.approx(max(sigma / fator, SIGMA_MINIMO_PREVIA))
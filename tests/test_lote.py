@@ -0,0 +1,55 @@
+import csv
+import os
+
+import numpy as np
+import pytest
+
+import lote
+from utils import colorir_rotulos, salvar_imagem
+
+
+def test_interpretar_operacao():
+    assert lote.interpretar_operacao('box:5') == ('box', {'tamanho': 5}, 'box_tamanho-5')
+    nome, params, _ = lote.interpretar_operacao('canny:sigma=2,interpolacao=True')
+    assert nome == 'canny' and params == {'sigma': 2, 'interpolacao': True}
+    with pytest.raises(ValueError):
+        lote.interpretar_operacao('desconhecida')
+    with pytest.raises(ValueError):
+        lote.interpretar_operacao('otsu:3')
+
+
+def test_nome_saida_inclui_extensao_e_subdiretorios(tmp_path):
+    raiz = str(tmp_path)
+    assert lote.nome_saida(os.path.join(raiz, '0.jpg'), raiz) == '0_jpg'
+    assert lote.nome_saida(os.path.join(raiz, 'sub', '0.PNG'), raiz) == os.path.join('sub', '0_png')
+
+
+def test_lote_sem_sobrescrever_mesmo_nome(tmp_path, imagem):
+    entrada = tmp_path / 'entrada'
+    (entrada / 'sub').mkdir(parents=True)
+    for nome in ('0.png', '0.bmp', os.path.join('sub', '0.png')):
+        salvar_imagem(imagem, str(entrada / nome))
+
+    saida = tmp_path / 'saida'
+    linhas = lote.executar_lote([str(entrada), str(entrada / 'sub')],
+                                ['otsu', 'freeman'], str(saida), processos=1)
+
+    assert len(linhas) == 6 and not any('erro' in linha for linha in linhas)
+    resultados = {linha['resultado'] for linha in linhas}
+    assert len(resultados) == 6 and all(os.path.isfile(r) for r in resultados)
+    assert (saida / 'sub' / '0_png_freeman.fcc').is_file()
+    with open(saida / 'resumo.csv', encoding='utf-8') as arquivo:
+        assert len(list(csv.DictReader(arquivo))) == 6
+
+
+def test_freeman_desenha_todos_os_contornos(imagem):
+    visual, medidas, extras = lote._op_freeman(imagem, {})
+    assert medidas['contornos'] > 0 and extras['.fcc']
+    assert np.count_nonzero(visual != imagem) > 0
+
+
+def test_contagem_colore_rotulos(imagem):
+    visual, medidas, _ = lote._op_count(imagem, {})
+    _, rotulos = lote.contar_objetos(lote.Otsu().aplicar(imagem)[0])
+    assert medidas['objetos'] == rotulos.max()
+    assert np.array_equal(visual, colorir_rotulos(rotulos))
@@ -0,0 +1,195 @@
+import numpy as np
+import pytest
+
+from utils import (
+    POLITICA_PRECISAO, carregar_imagem, convolucao, convolucao_separavel,
+    correlacao, criar_nucleo, criar_vetor_gaussiano, decompor_separavel, definir_precisao,
+    escolher_metodo_convolucao, estatisticas_imagem, estimar_custos_convolucao,
+    salvar_imagem, tipo_calculo
+)
+
+
+def convolucao_referencia(imagem, mascara):
+    # Laço pixel a pixel com padding de zeros de k//2 (implementação original)
+    altura_m, largura_m = mascara.shape
+    pad_h, pad_w = altura_m // 2, largura_m // 2
+    padded = np.pad(imagem.astype(np.float64), ((pad_h, pad_h), (pad_w, pad_w)))
+    rotacionada = np.flip(mascara)
+    resultado = np.zeros(imagem.shape)
+    for i in range(imagem.shape[0]):
+        for j in range(imagem.shape[1]):
+            resultado[i, j] = np.sum(padded[i:i + altura_m, j:j + largura_m] * rotacionada)
+    return resultado
+
+
+MASCARAS = {
+    '3x3': np.arange(9, dtype=np.float64).reshape(3, 3) - 4,
+    '5x3': np.random.default_rng(1).normal(size=(5, 3)),
+    '2x2': np.array([[1.0, -2.0], [0.5, 3.0]]),
+    '4x5': np.random.default_rng(2).normal(size=(4, 5)),
+}
+
+
+@pytest.mark.parametrize('nome', MASCARAS)
+def test_convolucao_direta(imagem, precisao_float64, nome):
+    mascara = MASCARAS[nome]
+    resultado = convolucao(imagem, mascara, metodo='direta')
+    assert resultado.dtype == np.float64
+    assert np.allclose(resultado, convolucao_referencia(imagem, mascara))
+
+
+def test_correlacao_rotaciona_mascara(imagem, precisao_float64):
+    mascara = MASCARAS['5x3']
+    assert np.allclose(correlacao(imagem, mascara, metodo='direta'),
+                       convolucao_referencia(imagem, np.flip(mascara)))
+
+
+def test_convolucao_float32_por_padrao(imagem):
+    mascara = MASCARAS['3x3']
+    resultado = convolucao(imagem, mascara, metodo='direta')
+    assert resultado.dtype == np.float32
+    assert np.allclose(resultado, convolucao_referencia(imagem, mascara), atol=1e-2)
+
+
+def direto(imagem):
+    # Referência: reduções diretas do numpy (cálculo original)
+    return {'min': imagem.min(), 'max': imagem.max(), 'media': imagem.mean(),
+            'desvio': imagem.std(), 'niveis_unicos': len(np.unique(imagem))}
+
+
+@pytest.mark.parametrize('tipo', [np.uint8, np.int16, np.float32, np.float64])
+def test_estatisticas_pelo_histograma(imagem, tipo):
+    img = imagem.astype(tipo)
+    if tipo == np.int16:
+        img -= 100
+    stats, esperado = estatisticas_imagem(img), direto(img)
+    for chave in esperado:
+        assert type(stats[chave]) is type(esperado[chave]), chave
+        assert stats[chave] == pytest.approx(esperado[chave], rel=1e-5)
+
+
+def test_estatisticas_valores_reais():
+    img = np.linspace(0, 1, 101, dtype=np.float32).reshape(1, -1)
+    stats = estatisticas_imagem(img)
+    assert stats['niveis_unicos'] == 101
+    assert stats['media'] == pytest.approx(0.5)
+
+
+def test_estatisticas_imagem_vazia():
+    with pytest.raises(ValueError):
+        estatisticas_imagem(np.zeros((0, 3), dtype=np.uint8))
+
+
+def test_decompor_separavel():
+    vertical, horizontal = np.array([1.0, 2.0, 1.0]), np.array([-1.0, 0.0, 1.0])
+    fatores = decompor_separavel(np.outer(vertical, horizontal))
+    assert fatores is not None
+    assert np.allclose(np.outer(*fatores), np.outer(vertical, horizontal))
+    assert decompor_separavel(MASCARAS['3x3']) is None
+    assert decompor_separavel(np.ones((1, 5))) is None
+
+
+def test_convolucao_separavel_equivale_a_2d(imagem, precisao_float64):
+    vertical = criar_vetor_gaussiano(7, 1.5)
+    horizontal = np.array([-1.0, 0.0, 1.0, 2.0])
+    esperado = convolucao_referencia(imagem, np.outer(vertical, horizontal))
+    assert np.allclose(convolucao_separavel(imagem, vertical, horizontal), esperado)
+    assert np.allclose(convolucao(imagem, np.outer(vertical, horizontal), metodo='separavel'), esperado)
+
+
+def test_convolucao_separavel_rejeita_mascara_geral(imagem):
+    with pytest.raises(ValueError):
+        convolucao(imagem, MASCARAS['3x3'], metodo='separavel')
+
+
+@pytest.mark.parametrize('nome', MASCARAS)
+def test_convolucao_fft_equivale_a_direta(imagem, precisao_float64, nome):
+    mascara = MASCARAS[nome]
+    assert np.allclose(convolucao(imagem, mascara, metodo='fft'),
+                       convolucao_referencia(imagem, mascara))
+
+
+def test_escolha_do_metodo_pelo_custo():
+    gaussiana = np.outer(criar_vetor_gaussiano(5, 1), criar_vetor_gaussiano(5, 1))
+    geral = np.random.default_rng(3).normal(size=(31, 31))
+    assert escolher_metodo_convolucao((512, 512), gaussiana) == 'separavel'
+    assert escolher_metodo_convolucao((16, 16), MASCARAS['3x3']) == 'direta'
+    assert escolher_metodo_convolucao((1024, 1024), geral) == 'fft'
+    custos = estimar_custos_convolucao((64, 64), (3, 3))
+    assert set(custos) == {'direta', 'fft'}
+
+
+def test_metodo_desconhecido(imagem):
+    with pytest.raises(ValueError):
+        convolucao(imagem, MASCARAS['3x3'], metodo='outro')
+
+
+@pytest.fixture
+def politica():
+    # Restaura a política de precisão ao fim do teste
+    anterior = dict(POLITICA_PRECISAO)
+    yield
+    definir_precisao(**anterior)
+
+
+def test_politica_padrao():
+    assert POLITICA_PRECISAO['carregamento'] is np.uint8
+    assert tipo_calculo() is np.float32
+
+
+def test_definir_precisao(politica, imagem):
+    assert definir_precisao(calculo='float64') == {'carregamento': np.uint8, 'calculo': np.float64}
+    assert tipo_calculo() is np.float64
+    assert convolucao(imagem, MASCARAS['3x3']).dtype == np.float64
+    
+    definir_precisao(calculo=np.float32)
+    assert convolucao(imagem, MASCARAS['3x3']).dtype == np.float32
+
+
+def test_precisao_de_calculo_inteira(politica):
+    with pytest.raises(ValueError):
+        definir_precisao(calculo=np.int32)
+    assert tipo_calculo() is np.float32
+
+
+def test_carregar_imagem_segue_politica(politica, imagem, tmp_path):
+    caminho = str(tmp_path / 'imagem.png')
+    salvar_imagem(imagem, caminho)
+    
+    carregada = carregar_imagem(caminho)
+    assert carregada.dtype == np.uint8 and np.array_equal(carregada, imagem)
+    # Cópia gravável: o código do usuário pode editar a imagem no lugar
+    assert carregada.flags.writeable
+    assert carregar_imagem(caminho, dtype=np.float32).dtype == np.float32
+    
+    definir_precisao(carregamento=np.float64)
+    assert carregar_imagem(caminho).dtype == np.float64
+
+
+@pytest.mark.parametrize('tipo', ['gaussiana', 'gaussiana_1d', 'log'])
+def test_nucleo_em_cache_somente_leitura(tipo):
+    nucleo = criar_nucleo(tipo, 7, 1.4)
+    assert criar_nucleo(tipo, 7.0, 1.4) is nucleo
+    assert criar_nucleo(tipo, 7, 1.4, dtype=np.float32) is not nucleo
+    with pytest.raises(ValueError):
+        nucleo[0] = 1
+
+
+def test_nucleo_equivale_as_formulas():
+    sigma = 1.3
+    # Tamanho par é ajustado para ímpar
+    x = np.arange(7) - 3
+    gaussiana_1d = np.exp(-x ** 2 / (2 * sigma ** 2))
+    assert np.allclose(criar_nucleo('gaussiana_1d', 6, sigma), gaussiana_1d / gaussiana_1d.sum())
+    
+    y, x = np.mgrid[-3:4, -3:4]
+    r2 = x ** 2 + y ** 2
+    gaussiana = np.exp(-r2 / (2 * sigma ** 2))
+    assert np.allclose(criar_nucleo('gaussiana', 7, sigma), gaussiana / gaussiana.sum())
+    log = (r2 - 2 * sigma ** 2) / sigma ** 4 * np.exp(-r2 / (2 * sigma ** 2))
+    assert np.allclose(criar_nucleo('log', 7, sigma), log)
+
+
+def test_nucleo_tipo_desconhecido():
+    with pytest.raises(ValueError):
+        criar_nucleo('caixa', 3, 1.0)
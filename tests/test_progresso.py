@@ -0,0 +1,63 @@
+import threading
+
+import numpy as np
+import pytest
+
+from algoritmos import CadeiaFreeman
+from utils import MonitorProgresso, OperacaoCancelada, monitorar, reportar_progresso, subetapa
+
+
+def test_fora_de_tarefa_nao_faz_nada():
+    reportar_progresso(0.5, "etapa")
+    with subetapa(0.2, 0.4):
+        reportar_progresso(1.0)
+
+
+def test_subetapas_aninhadas():
+    monitor = MonitorProgresso()
+    with monitorar(monitor):
+        with subetapa(0.5, 1.0, "segunda metade"):
+            assert monitor.etapa == "segunda metade"
+            reportar_progresso(0.5)
+            assert monitor.fracao == pytest.approx(0.75)
+            with subetapa(0.0, 0.5):
+                # Faixa [0.5, 0.75]: o progresso nunca regride
+                reportar_progresso(0.2)
+                assert monitor.fracao == pytest.approx(0.75)
+                reportar_progresso(1.0)
+                assert monitor.fracao == pytest.approx(0.75)
+            reportar_progresso(0.9)
+            assert monitor.fracao == pytest.approx(0.95)
+        assert monitor.faixa == (0.0, 1.0)
+        assert monitor.fracao == pytest.approx(1.0)
+
+
+def test_monitor_por_thread():
+    monitor = MonitorProgresso()
+    monitor.cancelar()
+    erros = []
+    
+    def outra_thread():
+        try:
+            reportar_progresso(0.5)
+        except OperacaoCancelada as erro:
+            erros.append(erro)
+    
+    with monitorar(monitor):
+        thread = threading.Thread(target=outra_thread)
+        thread.start()
+        thread.join()
+    assert erros == []
+    assert monitor.fracao == 0.0
+
+
+def test_cancelamento_interrompe_algoritmo():
+    binaria = np.zeros((20, 20), dtype=np.uint8)
+    binaria[::4, ::4] = 255
+    monitor = MonitorProgresso()
+    monitor.cancelar()
+    with monitorar(monitor), pytest.raises(OperacaoCancelada):
+        CadeiaFreeman().aplicar_todos(binaria)
+    
+    # O monitor anterior (nenhum) é restaurado após o bloco
+    reportar_progresso(1.0)
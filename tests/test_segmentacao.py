@@ -0,0 +1,239 @@
+import numpy as np
+import pytest
+
+from algoritmos import Otsu, Watershed, contar_objetos, maximos_regionais, transformada_distancia
+
+
+def separadas(rotulos):
+    # Nenhum par de pixels 8-vizinhos com rótulos positivos diferentes
+    p = np.pad(rotulos, 1)
+    centro = p[1:-1, 1:-1]
+    altura, largura = rotulos.shape
+    for dy in (-1, 0, 1):
+        for dx in (-1, 0, 1):
+            vizinho = p[1 + dy:1 + dy + altura, 1 + dx:1 + dx + largura]
+            if ((centro > 0) & (vizinho > 0) & (vizinho != centro)).any():
+                return False
+    return True
+
+
+def dois_vales():
+    # Relevo com dois vales separados por uma crista na coluna 20
+    relevo = np.abs(np.arange(41) - 20.0)[None, :].repeat(30, axis=0)
+    relevo = relevo.max() - relevo
+    marcadores = np.zeros(relevo.shape, dtype=np.int32)
+    marcadores[15, 2] = 1
+    marcadores[15, 38] = 2
+    return relevo, marcadores
+
+
+@pytest.mark.parametrize('niveis', [256, None])
+def test_inundar_linha_na_crista(niveis):
+    relevo, marcadores = dois_vales()
+    rotulos, linhas = Watershed(niveis=niveis).inundar(relevo, marcadores)
+    assert separadas(rotulos)
+    assert (linhas[:, 20] == 255).all()
+    assert (rotulos[:, :20] == 1).all() and (rotulos[:, 21:] == 2).all()
+
+
+def test_inundar_respeita_mascara():
+    relevo, marcadores = dois_vales()
+    mascara = np.ones(relevo.shape, dtype=bool)
+    mascara[:, 30:] = False
+    marcadores[15, 38] = 0
+    rotulos, linhas = Watershed().inundar(relevo, marcadores, mascara)
+    assert (rotulos[:, :30] == 1).all() and (rotulos[:, 30:] == 0).all()
+    assert not linhas.any()
+
+
+@pytest.mark.parametrize('marcadores_distancia', [False, True])
+def test_aplicar_retorna_rotulos_e_linhas(imagem, marcadores_distancia):
+    rotulos, linhas = Watershed(marcadores_distancia=marcadores_distancia).aplicar(imagem)
+    assert rotulos.shape == linhas.shape == imagem.shape
+    assert rotulos.max() > 0
+    assert separadas(rotulos)
+    assert not (rotulos[linhas > 0]).any()
+
+
+def otsu_referencia(imagem):
+    # Busca original: variância entre classes para cada threshold
+    histograma = np.bincount(imagem.ravel(), minlength=256)
+    total = imagem.size
+    soma_total = np.sum(np.arange(256) * histograma)
+    melhor, threshold = 0, 0
+    peso_b = soma_b = 0
+    for t in range(256):
+        peso_b += histograma[t]
+        if peso_b == 0:
+            continue
+        peso_f = total - peso_b
+        if peso_f == 0:
+            break
+        soma_b += t * histograma[t]
+        media_b, media_f = soma_b / peso_b, (soma_total - soma_b) / peso_f
+        variancia = (peso_b / total) * (peso_f / total) * (media_b - media_f) ** 2
+        if variancia > melhor:
+            melhor, threshold = variancia, t
+    return threshold
+
+
+def test_otsu_equivale_a_busca_original(imagem):
+    rng = np.random.default_rng(10)
+    bimodal = np.concatenate([rng.normal(60, 10, 500), rng.normal(180, 20, 700)])
+    bimodal = np.clip(bimodal, 0, 255).astype(np.uint8).reshape(30, 40)
+    for img in (imagem, bimodal):
+        assert Otsu().calcular_threshold(img) == otsu_referencia(img)
+
+
+def test_otsu_binariza_pelo_threshold(imagem):
+    binaria, threshold = Otsu().aplicar(imagem)
+    assert np.array_equal(binaria > 0, imagem >= threshold)
+    assert set(np.unique(binaria)) <= {0, 255}
+
+
+def rotular_referencia(binaria, conectividade):
+    # Busca em largura a partir de cada pixel ainda não rotulado, em ordem de varredura
+    vizinhos = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+    if conectividade == 8:
+        vizinhos += [(-1, -1), (-1, 1), (1, -1), (1, 1)]
+    altura, largura = binaria.shape
+    rotulos = np.zeros(binaria.shape, dtype=np.int64)
+    atual = 0
+    for i in range(altura):
+        for j in range(largura):
+            if binaria[i, j] and not rotulos[i, j]:
+                atual += 1
+                rotulos[i, j] = atual
+                fila = [(i, j)]
+                while fila:
+                    y, x = fila.pop()
+                    for dy, dx in vizinhos:
+                        v, u = y + dy, x + dx
+                        if 0 <= v < altura and 0 <= u < largura and binaria[v, u] and not rotulos[v, u]:
+                            rotulos[v, u] = atual
+                            fila.append((v, u))
+    return atual, rotulos
+
+
+def binaria_aleatoria(semente, densidade=0.45, forma=(40, 50)):
+    return (np.random.default_rng(semente).random(forma) < densidade).astype(np.uint8) * 255
+
+
+@pytest.mark.parametrize('conectividade', [4, 8])
+@pytest.mark.parametrize('semente', [11, 12])
+def test_rotulacao_equivale_a_busca(conectividade, semente):
+    binaria = binaria_aleatoria(semente)
+    num, rotulos = contar_objetos(binaria, conectividade=conectividade)
+    num_ref, rotulos_ref = rotular_referencia(binaria > 0, conectividade)
+    assert num == num_ref
+    assert np.array_equal(rotulos, rotulos_ref)
+
+
+def test_rotulacao_formas_em_u():
+    # Ramos que só se unem embaixo exigem a resolução de equivalências
+    binaria = np.zeros((8, 9), dtype=np.uint8)
+    binaria[1:7, 1] = binaria[1:7, 4] = binaria[1:7, 7] = 255
+    binaria[6, 1:8] = 255
+    num, rotulos = contar_objetos(binaria)
+    assert num == 1 and rotulos.max() == 1
+
+
+def test_rotulacao_conectividade_invalida():
+    with pytest.raises(ValueError):
+        contar_objetos(np.zeros((3, 3), dtype=np.uint8), conectividade=6)
+
+
+def test_estatisticas_regioes_equivalem_ao_calculo_direto(imagem):
+    binaria = binaria_aleatoria(13, densidade=0.55, forma=imagem.shape)
+    num, rotulos, regioes = contar_objetos(binaria, estatisticas=True, imagem=imagem)
+    for k in range(1, num + 1):
+        linhas, colunas = np.nonzero(rotulos == k)
+        assert regioes['area'][k - 1] == linhas.size
+        assert regioes['linha_min'][k - 1] == linhas.min()
+        assert regioes['linha_max'][k - 1] == linhas.max()
+        assert regioes['coluna_min'][k - 1] == colunas.min()
+        assert regioes['coluna_max'][k - 1] == colunas.max()
+        assert np.isclose(regioes['centroide_linha'][k - 1], linhas.mean())
+        assert np.isclose(regioes['centroide_coluna'][k - 1], colunas.mean())
+        assert np.isclose(regioes['intensidade_media'][k - 1], imagem[linhas, colunas].mean())
+
+
+def test_area_minima_renumera_em_ordem():
+    binaria = binaria_aleatoria(14)
+    num, rotulos, regioes = contar_objetos(binaria, estatisticas=True)
+    num_f, rotulos_f, regioes_f = contar_objetos(binaria, estatisticas=True, area_minima=5)
+    
+    manter = regioes['area'] >= 5
+    assert num_f == manter.sum()
+    assert np.array_equal(regioes_f['area'], regioes['area'][manter])
+    
+    # Mesma partição dos objetos mantidos, rótulos consecutivos na mesma ordem
+    esperado = np.zeros(num + 1, dtype=np.int64)
+    esperado[1:][manter] = np.arange(1, num_f + 1)
+    assert np.array_equal(rotulos_f, esperado[rotulos])
+
+
+def distancia_referencia(binaria):
+    # Força bruta: menor distância euclidiana a qualquer pixel de fundo
+    fundo = np.argwhere(binaria == 0)
+    pontos = np.indices(binaria.shape).reshape(2, -1).T
+    quadrados = ((pontos[:, None, :] - fundo[None, :, :]) ** 2).sum(axis=2)
+    return np.sqrt(quadrados.min(axis=1)).reshape(binaria.shape)
+
+
+@pytest.mark.parametrize('densidade', [0.7, 0.95])
+def test_distancia_equivale_a_forca_bruta(densidade):
+    binaria = binaria_aleatoria(15, densidade=densidade, forma=(23, 31))
+    assert np.allclose(transformada_distancia(binaria), distancia_referencia(binaria))
+
+
+def test_distancia_sem_fundo():
+    assert np.isinf(transformada_distancia(np.full((4, 5), 255, dtype=np.uint8))).all()
+
+
+def maximos_referencia(imagem, conectividade):
+    # Platôs rotulados por busca; máximo se nenhum vizinho externo é maior ou igual
+    vizinhos = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+    if conectividade == 8:
+        vizinhos += [(-1, -1), (-1, 1), (1, -1), (1, 1)]
+    altura, largura = imagem.shape
+    visitado = np.zeros(imagem.shape, dtype=bool)
+    maximos = np.zeros(imagem.shape, dtype=bool)
+    for i in range(altura):
+        for j in range(largura):
+            if visitado[i, j]:
+                continue
+            plato, fila, maximo = [], [(i, j)], True
+            visitado[i, j] = True
+            while fila:
+                y, x = fila.pop()
+                plato.append((y, x))
+                for dy, dx in vizinhos:
+                    v, u = y + dy, x + dx
+                    if not (0 <= v < altura and 0 <= u < largura):
+                        continue
+                    if imagem[v, u] > imagem[y, x]:
+                        maximo = False
+                    elif imagem[v, u] == imagem[y, x] and not visitado[v, u]:
+                        visitado[v, u] = True
+                        fila.append((v, u))
+            if maximo:
+                for y, x in plato:
+                    maximos[y, x] = True
+    return maximos
+
+
+@pytest.mark.parametrize('conectividade', [4, 8])
+def test_maximos_regionais_equivalem_a_busca(conectividade):
+    # Poucos níveis para formar platôs
+    relevo = np.random.default_rng(16).integers(0, 4, (30, 30))
+    assert np.array_equal(maximos_regionais(relevo, conectividade), maximos_referencia(relevo, conectividade))
+
+
+def test_maximos_regionais_da_distancia():
+    binaria = np.zeros((20, 40), dtype=np.uint8)
+    binaria[5:15, 5:15] = binaria[3:17, 22:36] = 255
+    maximos = maximos_regionais(transformada_distancia(binaria))
+    _, rotulos = contar_objetos(binaria)
+    # Um máximo (ou platô) no centro de cada quadrado
+    assert set(np.unique(rotulos[maximos])) == {1, 2}
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+
+from algoritmos import SegmentacaoCustomizada
+
+
+def por_mascaras(imagem, tabela):
+    # Referência: uma máscara por faixa sobre os valores originais;
+    # a primeira faixa que contém o valor prevalece
+    resultado = imagem.copy()
+    for min_val, max_val, novo_val in reversed(tabela):
+        resultado[(imagem >= min_val) & (imagem <= max_val)] = novo_val
+    return resultado
+
+
+TABELAS = [
+    SegmentacaoCustomizada().tabela,
+    [(0, 127.5, 0), (127.6, 255, 255)],
+    [(-np.inf, 10.2, 5), (10.3, np.inf, 200)],
+    [(3.2, 3.8, 9), (300, 400, 1)],
+    [(100, 150, 7), (0, 200, 30), (120, 255, 90)],
+    [(50.5, 60.5, 1), (20, 40, 2), (0, np.inf, 3)],
+]
+
+
+@pytest.mark.parametrize('tabela', TABELAS)
+@pytest.mark.parametrize('tipo', [np.uint8, np.float32, np.float64])
+def test_tabela_equivale_as_mascaras(imagem, tabela, tipo):
+    img = imagem.astype(tipo)
+    resultado = SegmentacaoCustomizada().aplicar_customizado(img, tabela)
+    assert resultado.dtype == img.dtype
+    assert np.array_equal(resultado, por_mascaras(img, tabela))
+
+
+def test_valores_nao_inteiros_usam_busca(imagem):
+    img = imagem.astype(np.float64) + 0.25
+    tabela = [(0, 100.1, 10.5), (100.2, 300, 99)]
+    resultado = SegmentacaoCustomizada().aplicar_customizado(img, tabela)
+    assert np.array_equal(resultado, por_mascaras(img, tabela))
+
+
+@pytest.mark.parametrize('tipo', [np.uint8, np.float64])
+def test_faixas_sobrepostas(tipo):
+    # A primeira faixa da tabela que contém o valor prevalece
+    imagem = np.array([[0, 49, 50, 100], [101, 150, 151, 255]]).astype(tipo)
+    tabela = [(0, 100, 1), (50, 150, 2)]
+    seg = SegmentacaoCustomizada()
+    _, resultado, contagens = seg._transformar(imagem, tabela)
+    assert np.array_equal(resultado, np.array([[1, 1, 1, 1], [2, 2, 151, 255]]).astype(tipo))
+    assert contagens == [4, 2]
+    
+    tabela = list(reversed(tabela))
+    resultado = seg.aplicar_customizado(imagem, tabela)
+    assert np.array_equal(resultado, np.array([[1, 1, 2, 2], [2, 2, 151, 255]]).astype(tipo))
+
+
+def test_contagens_por_faixa(imagem):
+    seg = SegmentacaoCustomizada()
+    faixas, _, contagens = seg._transformar(imagem, seg.tabela)
+    esperadas = [int(((imagem >= a) & (imagem <= b)).sum()) for a, b, _ in faixas]
+    assert contagens == esperadas
+    
+    # Com sobreposição, cada pixel conta só para a faixa que o transformou
+    tabela = [(100, 150, 7), (0, 200, 30)]
+    _, _, contagens = seg._transformar(imagem.astype(np.float64) + 0.5, tabela)
+    dentro = (imagem + 0.5 >= 100) & (imagem + 0.5 <= 150)
+    assert contagens == [int(dentro.sum()), int(((imagem + 0.5 <= 200) & ~dentro).sum())]
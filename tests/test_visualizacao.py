@@ -0,0 +1,44 @@
+import gc
+
+import numpy as np
+import pytest
+
+from utils import visualizacao
+from utils.visualizacao import PiramideExibicao, colorir_rotulos, obter_piramide
+
+
+@pytest.mark.parametrize('tipo', [np.uint8, np.float64])
+def test_cache_libera_arrays(tipo):
+    arrays = [np.full((64, 64), k, dtype=tipo) for k in range(5)]
+    chaves = [id(a) for a in arrays]
+    for a in arrays:
+        obter_piramide(a)
+    assert all(chave in visualizacao._piramides for chave in chaves)
+
+    del arrays, a
+    gc.collect()
+    assert not any(chave in visualizacao._piramides for chave in chaves)
+
+
+def test_cache_reutiliza_piramide():
+    imagem = np.zeros((32, 32), dtype=np.uint8)
+    assert obter_piramide(imagem) is obter_piramide(imagem)
+
+
+def test_miniatura_pelos_niveis():
+    imagem = (np.arange(256 * 512) % 256).astype(np.uint8).reshape(256, 512)
+    piramide = PiramideExibicao(imagem)
+    assert piramide.miniatura(100, 50).size == (100, 50)
+    assert piramide.miniatura(100, 50, alta_qualidade=True).size == (100, 50)
+    assert np.array_equal(np.asarray(piramide.niveis[0]), imagem)
+
+
+def test_colorir_rotulos():
+    rotulos = np.array([[0, 1, 2], [3, 0, 300]])
+    linhas = np.array([[0, 0, 1], [0, 0, 0]], dtype=np.uint8)
+    cores = colorir_rotulos(rotulos)
+    assert cores.dtype == np.uint8
+    assert cores[0, 0] == 0 and (cores[rotulos > 0] >= 40).all()
+    # Rótulos vizinhos com tons distintos
+    assert len({cores[0, 1], cores[0, 2], cores[1, 0]}) == 3
+    assert colorir_rotulos(rotulos, linhas)[0, 2] == 255